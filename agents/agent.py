@@ -1,6 +1,8 @@
 """ADK app entry point — root agent definition."""
 
 from google.adk.agents import SequentialAgent
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.apps import App
 
 from agents.ideation.agent import ideation_agent
 from agents.assets_generator.agent import assets_generator_agent
@@ -10,3 +12,16 @@ root_agent = SequentialAgent(
     description="End-to-end Instagram post generation pipeline: ideation then asset creation.",
     sub_agents=[ideation_agent, assets_generator_agent],
 )
+
+# Gemini context caching: an agent's repeated request prefix (its static
+# instruction, tools and earlier turns; the mood board and product results
+# arrive as turns) is cached after the first tool-calling turn and reused by
+# the following ones. Requests too small
+# for a cache to pay off are sent as usual.
+# The app is named after this package: `adk web`/`adk run` create sessions
+# under the folder name, and the runner looks them up under `app.name`.
+app = App(
+    name="agents",
+    root_agent=root_agent,
+    context_cache_config=ContextCacheConfig(ttl_seconds=600, min_tokens=2048),
+)
@@ -1,66 +1,79 @@
-"""Assets Generator agent definition — iterates over each idea."""
+"""Assets Generator agent definition — plans all prompts, then iterates over each idea."""
 
+import asyncio
 import os
 from collections.abc import AsyncGenerator
 
 from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events import Event
+from google.genai import types
 
+from agents.assets_generator.image_tool_agent import ImageToolAgent
+from agents.assets_generator.plan_cache_agent import PlanCacheAgent
 from agents.assets_generator.retry_agent import RetryAgent
 from agents.assets_generator.tools import (
+    copy_image,
+    entry_digest,
     generate_image,
-    save_all_assets,
+    generate_images,
+    prompt_digest,
     save_image_prompts,
+    summarize_saved_assets,
 )
+from agents.shared.rate_limiter import throttle_text_model
 from agents.shared.schemas import STATE_KEY_IDEAS, STATE_KEY_IMAGE_PROMPTS, STATE_KEY_IMAGE_RESULTS
 
 TEXT_MODEL = os.environ.get("TEXT_GENERATION_MODEL", "gemini-2.5-flash")
+MAX_PARALLEL_IDEAS = int(os.environ.get("MAX_PARALLEL_IDEAS", "3"))
+MAX_PARALLEL_PROMPTS = int(os.environ.get("MAX_PARALLEL_PROMPTS", "3"))
+
+# Instructions without state placeholders are sent as `static_instruction`, so
+# the system prompt is identical across runs and can be served from the
+# provider's prefix cache; only the ideas go in as user content.
 
 PROMPT_GENERATOR_INSTRUCTION = """\
 You are a visual designer for On, the Swiss running and athletic brand.
-Your job is to create detailed image generation prompts for an Instagram post.
-
-1. Read the current idea from state key `current_idea`.
-2. For this idea, craft 3 detailed image generation prompts considering "imagery_direction" field of current idea.
-
-IMPORTANT: Adhere to the instruction given in the "imagery_direction" field of current idea!
-
-## Current idea:
+Your job is to create detailed image generation prompts for Instagram posts.
 
-{current_idea}
-"""
-
-IMAGE_GENERATOR_INSTRUCTION = """\
-You are an image generator assistant. Your job is to generate an image for the current prompt.
+1. Read the ideas given in the "Ideas" message.
+2. For each idea, craft 3 detailed image generation prompts considering the "imagery_direction" field of that idea.
+3. Call `save_image_prompts` once with the prompts for all ideas, using each idea's "id" as idea_id and versions 1-3.
 
-Call the `generate_image` tool to generate the image. It reads the prompt and product
-reference images from state automatically — you do not need to pass any arguments.
+IMPORTANT: Adhere to the instruction given in the "imagery_direction" field of each idea!
 """
 
-ASSET_SAVER_INSTRUCTION = """\
-You are a file manager. Your job is to save generated images to disk.
+PENDING_IDEAS_TEMPLATE = """\
+## Ideas:
 
-Call `save_all_assets` to save all the generated images from state to the output directory.
-Report the results when done.
+{pending_ideas}
 """
 
 prompt_generator_agent = LlmAgent(
     name="prompt_generator_agent",
     model=TEXT_MODEL,
-    description="Creates detailed image generation prompts for the current idea.",
-    instruction=PROMPT_GENERATOR_INSTRUCTION,
+    description="Creates detailed image generation prompts for all pending ideas in one call.",
+    static_instruction=PROMPT_GENERATOR_INSTRUCTION,
+    instruction=PENDING_IDEAS_TEMPLATE,
     tools=[save_image_prompts],
     include_contents="none",
+    before_model_callback=throttle_text_model,
+)
+
+prompt_generator_with_cache = PlanCacheAgent(
+    name="prompt_generator_with_cache",
+    description="Plans image prompts for all ideas, reusing cached plans from past runs.",
+    sub_agents=[prompt_generator_agent],
+    # Plans made with another model or instructions are not reused
+    planner_version="\n".join(
+        [TEXT_MODEL, PROMPT_GENERATOR_INSTRUCTION, PENDING_IDEAS_TEMPLATE]
+    ),
 )
 
-image_generator_agent = LlmAgent(
+image_generator_agent = ImageToolAgent(
     name="image_generator_agent",
-    model=TEXT_MODEL,
-    description="Generates images by calling the generate_image tool.",
-    instruction=IMAGE_GENERATOR_INSTRUCTION,
-    tools=[generate_image],
-    include_contents="none",
+    description="Generates the image for the current prompt.",
+    tool=generate_image,
 )
 
 image_generator_with_retry = RetryAgent(
@@ -71,62 +84,235 @@ image_generator_with_retry = RetryAgent(
     base_delay=2.0,
 )
 
-asset_saver_agent = LlmAgent(
-    name="asset_saver_agent",
-    model=TEXT_MODEL,
-    description="Saves generated image assets to disk.",
-    instruction=ASSET_SAVER_INSTRUCTION,
-    tools=[save_all_assets],
-    include_contents="none",
-)
+
+def _fork_context(ctx: InvocationContext, branch: str, **state) -> InvocationContext:
+    """Copies the invocation context for one concurrent task.
+
+    The fork gets its own session state dict, seeded with ``state``, so
+    sub-agents and tools (which read ``current_idea``, ``current_prompt`` and
+    the prompt/result keys through it) never see another task's values. It
+    also gets its own ADK branch (``<parent branch>.<branch>``), so each
+    task's events stay segregated from its siblings' in LLM history. Events
+    are still appended to the real session by the runner.
+    """
+    session = ctx.session.model_copy(update={"state": {**ctx.session.state, **state}})
+    return ctx.model_copy(
+        update={
+            "session": session,
+            "branch": f"{ctx.branch}.{branch}" if ctx.branch else branch,
+        }
+    )
+
+
+async def _merge_runs(
+    runs: list[AsyncGenerator[Event, None]], max_parallel: int
+) -> AsyncGenerator[Event, None]:
+    """Runs event generators concurrently and yields their events as they arrive.
+
+    At most ``max_parallel`` generators are active at once. Each generator
+    waits for its event to be consumed before producing the next one, so the
+    runner has appended the event before the sub-agent moves on. The first
+    error raised by a generator is re-raised as is. When this generator is
+    closed early (the consumer raised or went away), the remaining runs are
+    cancelled and every generator is closed before the close completes.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def drain(run: AsyncGenerator[Event, None]) -> None:
+        error = None
+        try:
+            async with semaphore:
+                async for event in run:
+                    consumed = asyncio.Event()
+                    await queue.put((event, consumed, None))
+                    await consumed.wait()
+        except Exception as exc:
+            error = exc
+        finally:
+            try:
+                # Runs the sub-agent's own cleanup, even if it never started
+                await run.aclose()
+            finally:
+                queue.put_nowait((done, None, error))
+
+    tasks = [asyncio.create_task(drain(run)) for run in runs]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event, consumed, error = await queue.get()
+            if error is not None:
+                raise error
+            if event is done:
+                remaining -= 1
+                continue
+            yield event
+            consumed.set()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _prompt_key(entry: dict) -> tuple:
+    """Identifies a prompt (or the image result produced for it)."""
+    return entry["idea_id"], entry["version"]
+
+
+class SharedImages:
+    """Image results shared by the ideas of one ForEachIdeaAgent run.
+
+    Prompts are identified by ``prompt_digest``. The first prompt to claim a
+    digest owns it: only the owner's idea sends it to the model, and identical
+    prompts of later ideas wait for the owner's image and copy it.
+    """
+
+    def __init__(self) -> None:
+        self._results: dict[str, asyncio.Future] = {}
+
+    def claim(self, digest: str) -> bool:
+        """Claims ``digest`` for the calling prompt; False if another prompt owns it."""
+        if digest in self._results:
+            return False
+        self._results[digest] = asyncio.get_running_loop().create_future()
+        return True
+
+    def publish(self, digest: str, result: dict | None) -> None:
+        """Records the owner's image result (None if it got no image)."""
+        future = self._results.get(digest)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def result(self, digest: str) -> dict | None:
+        """Waits for the owner's image result."""
+        return await self._results[digest]
 
 
 class ForEachPromptAgent(BaseAgent):
-    """Iterates over image prompts from state and runs sub-agents for each one."""
+    """Generates images for the prompts the batched call left without one.
+
+    Each missing prompt gets a forked context holding its own
+    ``current_prompt`` and ``STATE_KEY_IMAGE_RESULTS`` bucket, and at most
+    ``max_parallel`` prompts are in flight at once. Results are published to
+    the run's ``shared_images``, and the idea's ``duplicate_prompts`` (owned
+    by earlier ideas) are filled by copying those ideas' images. Results are
+    stored in version order.
+    """
+
+    max_parallel: int = 3
 
     async def _run_async_impl(
         self, ctx: InvocationContext
     ) -> AsyncGenerator[Event, None]:
         prompts = ctx.session.state.get(STATE_KEY_IMAGE_PROMPTS, [])
-        accumulated_results: list[dict] = []
-
-        for prompt_entry in prompts:
-            # Set single prompt for image generator
-            ctx.session.state["current_prompt"] = prompt_entry
-            # Clear results so RetryAgent can detect fresh success/failure
-            ctx.session.state.pop(STATE_KEY_IMAGE_RESULTS, None)
-
+        duplicates = ctx.session.state.get("duplicate_prompts", [])
+        shared: SharedImages = ctx.session.state.get("shared_images") or SharedImages()
+        reference_paths = ctx.session.state.get("current_idea", {}).get("product_image_urls", [])
+        digests = {_prompt_key(entry): entry_digest(entry, reference_paths) for entry in prompts}
+
+        results_by_prompt = {
+            _prompt_key(result): result
+            for result in ctx.session.state.get(STATE_KEY_IMAGE_RESULTS) or []
+        }
+        to_generate = [entry for entry in prompts if _prompt_key(entry) not in results_by_prompt]
+
+        async def run_prompt(entry: dict) -> AsyncGenerator[Event, None]:
+            prompt_ctx = _fork_context(
+                ctx, f"{self.name}.v{entry['version']}", current_prompt=entry
+            )
+            # Start without results so RetryAgent can detect fresh success/failure
+            prompt_ctx.session.state.pop(STATE_KEY_IMAGE_RESULTS, None)
             for sub_agent in self.sub_agents:
-                async for event in sub_agent.run_async(ctx):
+                async for event in sub_agent.run_async(prompt_ctx):
                     yield event
-
-            # Collect the single result produced by image generator
-            results = ctx.session.state.get(STATE_KEY_IMAGE_RESULTS, [])
+            results = prompt_ctx.session.state.get(STATE_KEY_IMAGE_RESULTS) or []
             if results:
-                accumulated_results.append(results[0])
+                results_by_prompt[_prompt_key(entry)] = results[0]
+            shared.publish(digests[_prompt_key(entry)], results[0] if results else None)
+
+        try:
+            # Share what the batched call already produced with later ideas
+            for key, result in results_by_prompt.items():
+                if key in digests:
+                    shared.publish(digests[key], result)
+
+            async for event in _merge_runs(
+                [run_prompt(entry) for entry in to_generate], self.max_parallel
+            ):
+                yield event
+        finally:
+            # Always resolve this idea's prompts, so later ideas never wait forever
+            for key, digest in digests.items():
+                shared.publish(digest, results_by_prompt.get(key))
+
+        for entry in duplicates:
+            source = await shared.result(entry_digest(entry, reference_paths))
+            if source:
+                results_by_prompt[_prompt_key(entry)] = await asyncio.to_thread(
+                    copy_image, source, entry["idea_id"], entry["version"]
+                )
+
+        # Store all results in version order for the asset report
+        ctx.session.state[STATE_KEY_IMAGE_RESULTS] = sorted(
+            results_by_prompt.values(), key=lambda result: result["version"]
+        )
+
+
+class AssetReportAgent(BaseAgent):
+    """Reports the images saved for the current idea without an LLM round-trip."""
 
-        # Store all accumulated results so asset_saver_agent works unchanged
-        ctx.session.state[STATE_KEY_IMAGE_RESULTS] = accumulated_results
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        results = ctx.session.state.get(STATE_KEY_IMAGE_RESULTS) or []
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(
+                role="model",
+                parts=[types.Part.from_text(text=summarize_saved_assets(results))],
+            ),
+        )
 
 
 # Inner pipeline that processes a single idea
 idea_pipeline = SequentialAgent(
     name="idea_pipeline",
-    description="Processes a single idea: prompts, image generation, and saving.",
+    description="Processes a single idea: image generation and reporting saved files.",
     sub_agents=[
-        prompt_generator_agent,
+        ImageToolAgent(
+            name="batch_image_generator",
+            description="Generates all images for the current idea in one call.",
+            tool=generate_images,
+        ),
         ForEachPromptAgent(
             name="for_each_prompt",
-            description="Iterates over image prompts one by one.",
+            description="Retries prompts the batched call missed, one call per prompt.",
             sub_agents=[image_generator_with_retry],
+            max_parallel=MAX_PARALLEL_PROMPTS,
+        ),
+        AssetReportAgent(
+            name="asset_report",
+            description="Reports the image files saved for the current idea.",
         ),
-        asset_saver_agent,
     ],
 )
 
 
 class ForEachIdeaAgent(BaseAgent):
-    """Iterates over ideas from state and runs the sub-agent pipeline for each."""
+    """Runs the sub-agent pipeline for every idea in state concurrently.
+
+    Each idea gets a forked context holding its own ``current_idea`` and its
+    share of the already planned ``STATE_KEY_IMAGE_PROMPTS``, and at most
+    ``max_parallel`` ideas are in flight at once. A prompt identical to one of
+    an earlier idea (same text, same product photos) is left out of the idea's
+    prompts and put in its ``duplicate_prompts`` instead, so it is generated
+    once and copied; ``shared_images`` carries those results between ideas.
+    """
+
+    max_parallel: int = 3
 
     async def _run_async_impl(
         self, ctx: InvocationContext
@@ -134,15 +320,58 @@ class ForEachIdeaAgent(BaseAgent):
         ideas_output = ctx.session.state.get(STATE_KEY_IDEAS, {})
         ideas = ideas_output.get("ideas", [])
 
-        for idea in ideas:
-            ctx.session.state["current_idea"] = idea
+        prompts_by_idea: dict[str, list[dict]] = {}
+        for entry in ctx.session.state.get(STATE_KEY_IMAGE_PROMPTS) or []:
+            prompts_by_idea.setdefault(entry["idea_id"], []).append(entry)
+
+        # Earlier ideas own shared prompts. Ideas start in order, so an owner
+        # is always running (or done) before an idea waits on its image.
+        shared = SharedImages()
+        idea_ctxs = []
+        for i, idea in enumerate(ideas, 1):
+            reference_paths = idea.get("product_image_urls", [])
+            owned, duplicates = [], []
+            for entry in prompts_by_idea.get(idea.get("id"), []):
+                # Keep the claimed digest, so later lookups never re-stat the photos
+                digest = prompt_digest(entry, reference_paths)
+                entry = {**entry, "digest": digest}
+                if shared.claim(digest):
+                    owned.append(entry)
+                else:
+                    duplicates.append(entry)
+            # Fork every idea up front so none inherits another idea's prompts/results
+            idea_ctx = _fork_context(
+                ctx,
+                f"{self.name}.{idea.get('id') or i}",
+                current_idea=idea,
+                duplicate_prompts=duplicates,
+                shared_images=shared,
+                **{STATE_KEY_IMAGE_PROMPTS: owned},
+            )
+            idea_ctx.session.state.pop(STATE_KEY_IMAGE_RESULTS, None)
+            idea_ctxs.append(idea_ctx)
+
+        async def run_idea(idea_ctx: InvocationContext) -> AsyncGenerator[Event, None]:
             for sub_agent in self.sub_agents:
-                async for event in sub_agent.run_async(ctx):
+                async for event in sub_agent.run_async(idea_ctx):
                     yield event
 
+        async for event in _merge_runs(
+            [run_idea(idea_ctx) for idea_ctx in idea_ctxs], self.max_parallel
+        ):
+            yield event
+
 
-assets_generator_agent = ForEachIdeaAgent(
+assets_generator_agent = SequentialAgent(
     name="assets_generator_agent",
-    description="Visual designer that generates Instagram post images, processing each idea in a loop.",
-    sub_agents=[idea_pipeline],
+    description="Visual designer that plans image prompts for all ideas, then generates each idea's images.",
+    sub_agents=[
+        prompt_generator_with_cache,
+        ForEachIdeaAgent(
+            name="for_each_idea",
+            description="Generates and saves the images of every idea concurrently.",
+            sub_agents=[idea_pipeline],
+            max_parallel=MAX_PARALLEL_IDEAS,
+        ),
+    ],
 )
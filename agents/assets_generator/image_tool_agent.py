@@ -0,0 +1,35 @@
+"""ImageToolAgent — runs an image generation tool without an LLM round-trip."""
+
+from collections.abc import AsyncGenerator, Awaitable, Callable
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.tools import ToolContext
+from google.genai import types
+
+
+class ImageToolAgent(BaseAgent):
+    """Calls ``tool`` directly with a ``ToolContext`` for the current invocation.
+
+    The image tools take no arguments and read everything they need from
+    state, so an LLM turn in front of them would only decide to call them.
+    Running them directly lets concurrent ideas and prompts go straight to
+    the image model. The tool's message and state changes are yielded as a
+    single event.
+    """
+
+    tool: Callable[[ToolContext], Awaitable[str]]
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        tool_context = ToolContext(ctx)
+        message = await self.tool(tool_context)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=tool_context.actions,
+            content=types.Content(role="model", parts=[types.Part.from_text(text=message)]),
+        )
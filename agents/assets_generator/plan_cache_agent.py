@@ -0,0 +1,112 @@
+"""PlanCacheAgent — plans image prompts for all ideas at once, reusing cached plans."""
+
+import hashlib
+import json
+import logging
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+from agents.shared.files import write_atomic
+from agents.shared.schemas import (
+    IMAGE_PROMPTS_ADAPTER,
+    STATE_KEY_IDEAS,
+    STATE_KEY_IMAGE_PROMPTS,
+)
+
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_DIR = Path(__file__).parent.parent.parent / ".cache" / "plans"
+
+
+def plan_key(idea: dict, planner_version: str = "") -> str:
+    """Hashes the idea fields and planner version that determine its image prompts."""
+    payload = json.dumps([
+        planner_version,
+        idea.get("product_sku", ""),
+        idea.get("imagery_direction", ""),
+        idea.get("mood", ""),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlanCacheAgent(BaseAgent):
+    """Runs the prompt-generation sub-agent once for every idea without a cached plan.
+
+    Plans are keyed by each idea's product SKU, imagery direction and mood,
+    plus ``planner_version`` (the planner's model and instructions), and
+    stored as one JSON file per key under ``cache_dir``. Ideas with a cached
+    plan reuse its prompts (relabelled with the idea's id); the rest are put
+    in ``pending_ideas`` state and planned together by a single sub-agent run,
+    whose prompts are then cached per idea. Afterwards
+    ``STATE_KEY_IMAGE_PROMPTS`` holds the prompts of all ideas, in idea order.
+    """
+
+    cache_dir: Path = PLAN_CACHE_DIR
+    planner_version: str = ""
+
+    def _read_plan(self, idea: dict) -> list[dict] | None:
+        """Returns the cached prompts for ``idea``, or None on a miss or unreadable file."""
+        cache_path = self.cache_dir / f"{plan_key(idea, self.planner_version)}.json"
+        try:
+            plan = IMAGE_PROMPTS_ADAPTER.validate_json(cache_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("[PlanCacheAgent] Ignoring unreadable plan %s: %s", cache_path.name, e)
+            return None
+        return IMAGE_PROMPTS_ADAPTER.dump_python(plan)
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        ideas = ctx.session.state.get(STATE_KEY_IDEAS, {}).get("ideas", [])
+        prompts_by_idea: dict[str, list[dict]] = {}
+        pending = []
+        for idea in ideas:
+            cached = self._read_plan(idea)
+            if cached is not None:
+                prompts_by_idea[idea.get("id", "")] = [
+                    {**entry, "idea_id": idea.get("id", "")} for entry in cached
+                ]
+            else:
+                pending.append(idea)
+        logger.info(
+            "[PlanCacheAgent] Reusing cached prompts for %d of %d idea(s).",
+            len(ideas) - len(pending),
+            len(ideas),
+        )
+
+        if pending:
+            ctx.session.state["pending_ideas"] = pending
+            ctx.session.state.pop(STATE_KEY_IMAGE_PROMPTS, None)
+
+            sub_agent = self.sub_agents[0]
+            async for event in sub_agent.run_async(ctx):
+                yield event
+
+            pending_ids = {idea.get("id", "") for idea in pending}
+            for entry in ctx.session.state.get(STATE_KEY_IMAGE_PROMPTS) or []:
+                if entry["idea_id"] in pending_ids:
+                    prompts_by_idea.setdefault(entry["idea_id"], []).append(entry)
+
+            for idea in pending:
+                prompts = prompts_by_idea.get(idea.get("id", ""))
+                if not prompts:
+                    logger.warning("[PlanCacheAgent] No prompts generated for %s.", idea.get("id"))
+                    continue
+                cache_path = self.cache_dir / f"{plan_key(idea, self.planner_version)}.json"
+                try:
+                    self.cache_dir.mkdir(parents=True, exist_ok=True)
+                    # Atomic, so a run interrupted mid-write never leaves a truncated plan
+                    write_atomic(cache_path, json.dumps(prompts, indent=2).encode("utf-8"))
+                except OSError as e:
+                    logger.warning("[PlanCacheAgent] Could not cache plan %s: %s", cache_path.name, e)
+            logger.info("[PlanCacheAgent] Planned %d idea(s) in one call.", len(pending))
+
+        ctx.session.state[STATE_KEY_IMAGE_PROMPTS] = [
+            entry for idea in ideas for entry in prompts_by_idea.get(idea.get("id", ""), [])
+        ]
@@ -1,23 +1,47 @@
-"""RetryAgent — wraps a sub-agent with exponential-backoff retries."""
+"""RetryAgent — wraps a sub-agent with jittered exponential-backoff retries."""
 
 import asyncio
 import logging
+import random
 from collections.abc import AsyncGenerator
 
 from google.adk.agents import BaseAgent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events import Event
 
-from agents.shared.schemas import STATE_KEY_IMAGE_RESULTS
+from agents.shared.schemas import (
+    STATE_KEY_IMAGE_RESULTS,
+    STATE_KEY_LAST_ERROR_CODE,
+    STATE_KEY_LAST_FINISH_REASON,
+)
 
 logger = logging.getLogger(__name__)
 
+# Finish/block reasons that will not change on a retry with the same prompt.
+NON_RETRIABLE_FINISH_REASONS = frozenset(
+    {
+        "SAFETY",
+        "BLOCKLIST",
+        "PROHIBITED_CONTENT",
+        "SPII",
+        "RECITATION",
+        "IMAGE_SAFETY",
+        "IMAGE_PROHIBITED_CONTENT",
+        "IMAGE_RECITATION",
+    }
+)
+
+# API error codes for invalid or unauthorized requests (429 and 5xx stay retriable).
+NON_RETRIABLE_ERROR_CODES = frozenset({400, 401, 403, 404})
+
 
 class RetryAgent(BaseAgent):
-    """Runs a single sub-agent and retries on failure with exponential backoff.
+    """Runs a single sub-agent and retries on failure with jittered exponential backoff.
 
     A "failure" is defined as the sub-agent finishing without populating
-    ``STATE_KEY_IMAGE_RESULTS`` in session state.
+    ``STATE_KEY_IMAGE_RESULTS`` in session state. Failures caused by a safety
+    block or an invalid request (see ``STATE_KEY_LAST_FINISH_REASON`` and
+    ``STATE_KEY_LAST_ERROR_CODE``) are not retried.
     """
 
     max_retries: int = 3
@@ -36,6 +60,9 @@ class RetryAgent(BaseAgent):
                 sub_agent.name,
             )
 
+            ctx.session.state.pop(STATE_KEY_LAST_FINISH_REASON, None)
+            ctx.session.state.pop(STATE_KEY_LAST_ERROR_CODE, None)
+
             async for event in sub_agent.run_async(ctx):
                 yield event
 
@@ -48,8 +75,24 @@ class RetryAgent(BaseAgent):
                 )
                 return
 
+            finish_reason = ctx.session.state.get(STATE_KEY_LAST_FINISH_REASON)
+            error_code = ctx.session.state.get(STATE_KEY_LAST_ERROR_CODE)
+            if (
+                finish_reason in NON_RETRIABLE_FINISH_REASONS
+                or error_code in NON_RETRIABLE_ERROR_CODES
+            ):
+                logger.error(
+                    "[RetryAgent] Non-retriable failure on attempt %d "
+                    "(finish_reason=%s, error_code=%s) — giving up.",
+                    attempt,
+                    finish_reason,
+                    error_code,
+                )
+                return
+
             if attempt < self.max_retries:
-                delay = self.base_delay * (2 ** (attempt - 1))
+                # Full jitter keeps parallel ideas from retrying in lockstep
+                delay = random.uniform(0, self.base_delay * (2 ** (attempt - 1)))
                 logger.warning(
                     "[RetryAgent] No images produced on attempt %d. "
                     "Retrying in %.1fs…",
@@ -1,33 +1,296 @@
 """Tools for the Assets Generator agent."""
 
-import base64
-import json
+import asyncio
+import functools
+import hashlib
+import io
 import logging
 import os
+import shutil
 from pathlib import Path
 
+from google import genai
 from google.adk.tools import ToolContext
 from google.genai import types
 from PIL import Image
+from pydantic import ValidationError
+
+from agents.shared.files import write_atomic
+from agents.shared.rate_limiter import image_model_bucket
+from agents.shared.schemas import IMAGE_PROMPTS_ADAPTER
 
 logger = logging.getLogger(__name__)
 
 OUTPUT_DIR = Path(__file__).parent.parent.parent / "output"
+IMAGE_CACHE_DIR = Path(__file__).parent.parent.parent / ".cache" / "images"
+REFERENCE_CACHE_DIR = Path(__file__).parent.parent.parent / ".cache" / "references"
+
+# Reference photos are sent as JPEGs no larger than this on either side
+REFERENCE_MAX_SIZE = 1024
 IMAGE_MODEL = os.environ.get("IMAGE_GENERATION_MODEL", "gemini-2.5-flash-image")
 
+# Bump when the text sent around each image prompt (REFERENCE_IMAGES_NOTE, the
+# batch instructions, the generation config) changes, so cached images are redone
+_PROMPT_WRAPPER_VERSION = 1
+
+
+_HARM_CATEGORIES = (
+    types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+    types.HarmCategory.HARM_CATEGORY_HARASSMENT,
+    types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+    types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+    types.HarmCategory.HARM_CATEGORY_CIVIC_INTEGRITY,
+)
+
+# Built once at import and shared by every image generation call
+_BLOCK_NONE_SAFETY_SETTINGS = tuple(
+    types.SafetySetting(category=c, threshold=types.HarmBlockThreshold.BLOCK_NONE)
+    for c in _HARM_CATEGORIES
+)
+
+_IMAGE_GENERATION_CONFIG = types.GenerateContentConfig(
+    response_modalities=["TEXT", "IMAGE"],
+    safety_settings=list(_BLOCK_NONE_SAFETY_SETTINGS),
+    image_config=types.ImageConfig(aspect_ratio="1:1"),
+)
+
+REFERENCE_IMAGES_NOTE = (
+    "Product reference photos are provided as input images. Use them as visual "
+    "reference to accurately depict the product's real appearance, colors, shape, "
+    "and details."
+)
+
+
+def _downscale_image(path: Path) -> bytes:
+    """Re-encodes an image as a JPEG of at most ``REFERENCE_MAX_SIZE`` per side."""
+    with Image.open(path) as img:
+        img.thumbnail((REFERENCE_MAX_SIZE, REFERENCE_MAX_SIZE), Image.Resampling.LANCZOS)
+        if img.mode != "RGB":
+            # JPEG has no alpha; flatten transparent product shots onto white
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, "white")
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=88)
+        return buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=128)
+def _load_image_part(path_str: str, mtime_ns: int) -> tuple[str, bytes]:
+    """Loads a product reference image, downscaled, once per file version.
+
+    Full-resolution product photos are several MB each; the model only needs
+    a preview-sized copy. Keying on the modification time as well as the
+    path lets ideas sharing a product reuse the bytes while an edited photo
+    is picked up again. The downscaled JPEG is also kept on disk under the
+    same key, so later runs skip the decode and resize.
+
+    Returns:
+        Tuple of (mime_type, image bytes).
+    """
+    path = Path(path_str)
+    key = f"{path.resolve()}:{mtime_ns}"
+    cache_path = REFERENCE_CACHE_DIR / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.jpg"
+    if cache_path.is_file():
+        return "image/jpeg", cache_path.read_bytes()
+
+    data = _downscale_image(path)
+    REFERENCE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_atomic(cache_path, data)
+    return "image/jpeg", data
+
+
+def _read_reference_part(path_str: str) -> types.Part | None:
+    """Builds the part for one product photo, or None if it is missing or unreadable."""
+    path = Path(path_str)
+    if not path.is_file():
+        logger.warning("[reference_images] Skipping missing file: %s", path_str)
+        return None
+    try:
+        mime_type, data = _load_image_part(path_str, path.stat().st_mtime_ns)
+    except OSError as e:
+        logger.warning("[reference_images] Failed to load %s: %s", path_str, e)
+        return None
+    logger.info("[reference_images] Loaded reference image: %s", path.name)
+    return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+
+async def _load_reference_parts(image_paths: tuple[str, ...]) -> tuple[types.Part, ...]:
+    """Builds the reference-image parts for a set of product photos.
+
+    Missing or unreadable files are skipped. Files are stat'ed and read
+    concurrently in worker threads so disk I/O never blocks the event loop.
+    The image bytes are cached per path and modification time by
+    ``_load_image_part``, so ideas and retries with the same product photos
+    reuse them, while an edited or newly added photo is loaded again.
+    """
+    loaded = await asyncio.gather(
+        *(asyncio.to_thread(_read_reference_part, path_str) for path_str in image_paths)
+    )
+    return tuple(part for part in loaded if part is not None)
+
+
+@functools.cache
+def _client() -> genai.Client:
+    """Returns the process-wide Gemini client, so calls share its connection pool."""
+    return genai.Client()
+
+
+async def _generate_content(contents: list) -> types.GenerateContentResponse:
+    """Calls the Gemini image model (async, so concurrent ideas don't block each other)."""
+    async with image_model_bucket:
+        return await _client().aio.models.generate_content(
+            model=IMAGE_MODEL,
+            contents=contents,
+            config=_IMAGE_GENERATION_CONFIG,
+        )
+
+
+def _record_outcome(
+    tool_context: ToolContext,
+    response: types.GenerateContentResponse | None = None,
+    error: Exception | None = None,
+) -> None:
+    """Stores why the last image call ended so RetryAgent can skip hopeless retries.
+
+    The finish reason is the first candidate's ``finish_reason``, or the
+    prompt's ``block_reason`` when the model returned no candidates at all.
+    """
+    from google.genai import errors
+
+    from agents.shared.schemas import STATE_KEY_LAST_ERROR_CODE, STATE_KEY_LAST_FINISH_REASON
+
+    reason = None
+    if response is not None:
+        if response.candidates and response.candidates[0].finish_reason:
+            reason = response.candidates[0].finish_reason.value
+        elif response.prompt_feedback and response.prompt_feedback.block_reason:
+            reason = response.prompt_feedback.block_reason.value
+    tool_context.state[STATE_KEY_LAST_FINISH_REASON] = reason
+    tool_context.state[STATE_KEY_LAST_ERROR_CODE] = (
+        error.code if isinstance(error, errors.APIError) else None
+    )
+
+
+def _extract_image_data(
+    response: types.GenerateContentResponse, limit: int | None = None
+) -> list[bytes]:
+    """Returns the inline image payloads of the first candidate, in response order.
+
+    Only the first candidate is read (``response.parts``); other candidates
+    would duplicate its images. Scanning stops once ``limit`` images are found.
+    """
+    images = []
+    for part in response.parts or []:
+        if part.inline_data and part.inline_data.data:
+            images.append(part.inline_data.data)
+            if len(images) == limit:
+                break
+    return images
+
+
+def _output_path(idea_id: str, version: int) -> Path:
+    """Returns the output file for an idea's image variation, creating the directory."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    return OUTPUT_DIR / f"{idea_id}_v{version}.png"
+
+
+def _reference_version(path_str: str) -> str:
+    """Identifies one version of a reference photo by its path and modification time."""
+    try:
+        return f"{path_str}:{Path(path_str).stat().st_mtime_ns}"
+    except OSError:
+        return f"{path_str}:missing"
+
 
-def generate_image(tool_context: ToolContext) -> str:
+def prompt_digest(entry: dict, reference_paths: list[str]) -> str:
+    """Identifies the image a prompt would produce, regardless of idea/version.
+
+    Reference photos count by modification time as well as path, so editing a
+    product photo invalidates the images generated from its old version. The
+    image model and wrapper version count too, so switching either regenerates.
+    """
+    references = sorted(_reference_version(path_str) for path_str in reference_paths)
+    payload = "\n".join(
+        [IMAGE_MODEL, str(_PROMPT_WRAPPER_VERSION), entry["prompt"], *references]
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def entry_digest(entry: dict, reference_paths: list[str]) -> str:
+    """Returns the digest claimed for a prompt entry, computing it if unclaimed.
+
+    ForEachIdeaAgent stores the digest each prompt claimed under ``"digest"``,
+    so later steps match the claim even if a reference photo changes mid-run.
+    """
+    return entry.get("digest") or prompt_digest(entry, reference_paths)
+
+
+def _store_image(output_path: Path, digest: str, image_bytes: bytes) -> None:
+    """Writes an image to its output file and keeps a copy for identical prompts."""
+    output_path.write_bytes(image_bytes)
+    IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Atomic, so an idea restoring the same digest never copies a partial file
+    write_atomic(IMAGE_CACHE_DIR / f"{digest}.png", image_bytes)
+
+
+async def _restore_cached_image(entry: dict, digest: str) -> dict | None:
+    """Copies a cached image for the prompt into the output directory.
+
+    Returns:
+        The image result entry, or None if no image is cached for ``digest``.
+    """
+    cache_path = IMAGE_CACHE_DIR / f"{digest}.png"
+    if not cache_path.is_file():
+        return None
+    return await asyncio.to_thread(
+        copy_image, {"path": str(cache_path)}, entry["idea_id"], entry["version"]
+    )
+
+
+async def _write_image(idea_id: str, version: int, image_bytes: bytes, digest: str) -> dict:
+    """Writes a generated image to the output directory and the image cache.
+
+    Both writes are done in a single worker-thread hop, so multi-MB PNGs don't
+    block the event loop while other ideas are waiting on the model.
+
+    Returns:
+        The image result entry stored in state (the file path, not the bytes).
+    """
+    output_path = _output_path(idea_id, version)
+    await asyncio.to_thread(_store_image, output_path, digest, image_bytes)
+    return {"idea_id": idea_id, "version": version, "path": str(output_path)}
+
+
+def copy_image(result: dict, idea_id: str, version: int) -> dict:
+    """Reuses an already generated image for another idea/version.
+
+    Args:
+        result: Image result entry of the generated image.
+        idea_id: The ID of the post idea the copy is for.
+        version: Version number of the image variation the copy is for.
+
+    Returns:
+        The image result entry for the copy.
+    """
+    output_path = _output_path(idea_id, version)
+    if Path(result["path"]) != output_path:
+        shutil.copyfile(result["path"], output_path)
+    return {"idea_id": idea_id, "version": version, "path": str(output_path)}
+
+
+async def generate_image(tool_context: ToolContext) -> str:
     """Generates an image using the Gemini image generation API.
 
     Reads `current_prompt` and `current_idea` from state, loads product
     reference images from disk, calls the Gemini image generation model
-    directly, and stores the result in state.
+    directly, writes the image to the output directory, and stores its
+    path in state. An image cached for the same prompt and product photos
+    is reused without calling the model.
 
     Returns:
         Success or error message.
     """
-    from google import genai
-
     from agents.shared.schemas import STATE_KEY_IMAGE_RESULTS
 
     current_prompt = tool_context.state.get("current_prompt", {})
@@ -40,28 +303,22 @@ def generate_image(tool_context: ToolContext) -> str:
     if not prompt_text:
         return "Error: no prompt text found in current_prompt state."
 
-    # Load product reference images from disk
-    image_paths = current_idea.get("product_image_urls", [])
-    reference_images: list[Image.Image] = []
-    for path_str in image_paths:
-        path = Path(path_str)
-        if not path.is_file():
-            logger.warning("[generate_image] Skipping missing file: %s", path_str)
-            continue
-        try:
-            img = Image.open(path)
-            reference_images.append(img)
-            logger.info("[generate_image] Loaded reference image: %s", path.name)
-        except Exception as e:
-            logger.warning("[generate_image] Failed to load %s: %s", path_str, e)
+    digest = entry_digest(current_prompt, current_idea.get("product_image_urls", []))
+    cached = await _restore_cached_image(current_prompt, digest)
+    if cached:
+        tool_context.state[STATE_KEY_IMAGE_RESULTS] = [cached]
+        logger.info("[generate_image] Reused cached image for %s v%s", idea_id, version)
+        return f"Reused cached image for {idea_id} v{version}."
+
+    reference_images = await _load_reference_parts(
+        tuple(current_idea.get("product_image_urls", []))
+    )
 
     # Build contents: text prompt + reference images
     full_prompt = (
         "Generate exactly one image for the prompt below. "
         "The image should be square (1080x1080).\n\n"
-        "Product reference photos are provided as input images. Use them as visual "
-        "reference to accurately depict the product's real appearance, colors, shape, "
-        "and details.\n\n"
+        f"{REFERENCE_IMAGES_NOTE}\n\n"
         f"## Prompt:\n\n{prompt_text}"
     )
     contents: list = [full_prompt, *reference_images]
@@ -74,70 +331,130 @@ def generate_image(tool_context: ToolContext) -> str:
         version,
     )
 
-    # Debug output
-    print("\n" + "=" * 80)
-    print("[DEBUG] IMAGE GENERATION API CALL:")
-    print(f"  Model: {IMAGE_MODEL}")
-    print(f"  Idea: {idea_id} v{version}")
-    print(f"  Reference images: {len(reference_images)}")
-    print(f"  Prompt: {prompt_text[:200]}...")
-    print("=" * 80 + "\n")
-
-    # Call the Gemini API directly
-    client = genai.Client()
+    logger.debug("[generate_image] Prompt for %s v%s: %.200s", idea_id, version, prompt_text)
+
     try:
-        response = client.models.generate_content(
-            model=IMAGE_MODEL,
-            contents=contents,
-            config=types.GenerateContentConfig(
-                response_modalities=["TEXT", "IMAGE"],
-                safety_settings=[
-                    types.SafetySetting(
-                        category=c, threshold=types.HarmBlockThreshold.BLOCK_NONE
-                    )
-                    for c in [
-                        types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                        types.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                        types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                        types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                        types.HarmCategory.HARM_CATEGORY_CIVIC_INTEGRITY,
-                    ]
-                ],
-                image_config=types.ImageConfig(aspect_ratio="1:1"),
-            ),
-        )
+        response = await _generate_content(contents)
     except Exception as e:
         logger.error("[generate_image] API call failed: %s", e)
+        _record_outcome(tool_context, error=e)
         return f"Error: API call failed — {e}"
 
+    _record_outcome(tool_context, response=response)
+
     # Extract the generated image from response
     if not response.candidates:
         logger.warning("[generate_image] No candidates in response.")
         return "Error: no candidates in API response."
 
-    for part in response.candidates[0].content.parts:
-        if part.inline_data and part.inline_data.data:
-            image_b64 = base64.b64encode(part.inline_data.data).decode("utf-8")
-            tool_context.state[STATE_KEY_IMAGE_RESULTS] = [
-                {
-                    "idea_id": idea_id,
-                    "version": version,
-                    "image_base64": image_b64,
-                }
-            ]
-            logger.info(
-                "[generate_image] Successfully generated image for %s v%s",
-                idea_id,
-                version,
-            )
-            return f"Successfully generated image for {idea_id} v{version}."
+    images = _extract_image_data(response, limit=1)
+    if not images:
+        logger.warning("[generate_image] No image found in response parts.")
+        return "Error: no image found in API response."
+
+    tool_context.state[STATE_KEY_IMAGE_RESULTS] = [
+        await _write_image(idea_id, version, images[0], digest)
+    ]
+    logger.info(
+        "[generate_image] Successfully generated image for %s v%s",
+        idea_id,
+        version,
+    )
+    return f"Successfully generated image for {idea_id} v{version}."
+
+
+async def generate_images(tool_context: ToolContext) -> str:
+    """Generates images for all prompts of the current idea in a single API call.
+
+    Reads `STATE_KEY_IMAGE_PROMPTS` and `current_idea` from state and asks the
+    model for one image per prompt, uploading the product reference images
+    once. Prompts identical to an earlier idea's are not in
+    `STATE_KEY_IMAGE_PROMPTS` (see `duplicate_prompts`) and are not sent.
+    Prompts with an image cached from a past run (same prompt, same product
+    photos) reuse it and are left out of the call. Image parts are
+    mapped to the remaining prompts in order and written to the output
+    directory; prompts left without an image are picked up by the
+    per-prompt fallback.
+
+    Returns:
+        Summary of how many prompts got an image, or an error message.
+    """
+    from agents.shared.schemas import STATE_KEY_IMAGE_PROMPTS, STATE_KEY_IMAGE_RESULTS
+
+    prompts = tool_context.state.get(STATE_KEY_IMAGE_PROMPTS, [])
+    current_idea = tool_context.state.get("current_idea", {})
+
+    if not prompts:
+        if tool_context.state.get("duplicate_prompts"):
+            return "All prompts reuse images generated for earlier ideas."
+        return "Error: no image prompts found in state."
+
+    reference_paths = current_idea.get("product_image_urls", [])
+    digests = [entry_digest(entry, reference_paths) for entry in prompts]
+    cached = await asyncio.gather(
+        *(_restore_cached_image(entry, digest) for entry, digest in zip(prompts, digests))
+    )
+    results = [result for result in cached if result]
+    missing = [
+        (entry, digest)
+        for entry, digest, result in zip(prompts, digests, cached)
+        if result is None
+    ]
+    if not missing:
+        tool_context.state[STATE_KEY_IMAGE_RESULTS] = results
+        logger.info("[generate_images] Reused %d cached image(s).", len(results))
+        return f"Reused {len(results)} cached images."
+
+    reference_images = await _load_reference_parts(tuple(reference_paths))
+
+    prompt_sections = "\n\n".join(
+        f"## Prompt {i}:\n\n{entry['prompt']}" for i, (entry, _) in enumerate(missing, 1)
+    )
+    full_prompt = (
+        f"Generate exactly {len(missing)} images, one for each prompt below, "
+        "in the same order. Each image should be square (1080x1080).\n\n"
+        f"{REFERENCE_IMAGES_NOTE}\n\n"
+        f"{prompt_sections}"
+    )
+    contents: list = [full_prompt, *reference_images]
+
+    logger.info(
+        "[generate_images] Calling %s for %d prompt(s) with %d reference image(s)",
+        IMAGE_MODEL,
+        len(missing),
+        len(reference_images),
+    )
+
+    try:
+        response = await _generate_content(contents)
+    except Exception as e:
+        logger.error("[generate_images] API call failed: %s", e)
+        tool_context.state[STATE_KEY_IMAGE_RESULTS] = results
+        return f"Error: API call failed — {e}"
+
+    images = _extract_image_data(response, limit=len(missing))
+    generated = await asyncio.gather(
+        *(
+            _write_image(entry["idea_id"], entry["version"], image_bytes, digest)
+            for (entry, digest), image_bytes in zip(missing, images)
+        )
+    )
+    results.extend(generated)
+    tool_context.state[STATE_KEY_IMAGE_RESULTS] = results
 
-    logger.warning("[generate_image] No image found in response parts.")
-    return "Error: no image found in API response."
+    logger.info(
+        "[generate_images] Got %d/%d image(s) from one call.", len(generated), len(missing)
+    )
+    if not results:
+        return "Error: no image found in API response."
+    return (
+        f"Generated {len(generated)} of {len(missing)} images in one call "
+        f"({len(results) - len(generated)} reused from cache)."
+    )
 
 
 def save_image_prompts(prompts_json: str, tool_context: ToolContext) -> str:
-    """Saves the list of image generation prompts for the current idea to shared state.
+    """Saves the list of image generation prompts for the ideas to shared state.
 
     Args:
         prompts_json: JSON string containing a list of prompt objects.
@@ -149,73 +466,65 @@ def save_image_prompts(prompts_json: str, tool_context: ToolContext) -> str:
     """
     from agents.shared.schemas import STATE_KEY_IMAGE_PROMPTS
 
-    prompts = json.loads(prompts_json)
-    if not isinstance(prompts, list) or not prompts:
+    try:
+        validated = IMAGE_PROMPTS_ADAPTER.validate_json(prompts_json)
+    except ValidationError:
+        return (
+            "Error: prompts_json must be a JSON array of objects, "
+            "each with idea_id (str), version (int), and prompt (str)."
+        )
+    if not validated:
         return "Error: prompts_json must be a non-empty JSON array."
 
-    for entry in prompts:
-        if not all(k in entry for k in ("idea_id", "version", "prompt")):
-            return "Error: each prompt entry must have idea_id, version, and prompt."
+    prompts = IMAGE_PROMPTS_ADAPTER.dump_python(validated)
+    # Merge with earlier calls of this turn: the model may split the ideas
+    # across several (possibly parallel) calls; a resent prompt replaces its
+    # earlier version.
+    merged = {
+        (entry["idea_id"], entry["version"]): entry
+        for entry in tool_context.state.get(STATE_KEY_IMAGE_PROMPTS) or []
+    }
+    merged.update(((entry["idea_id"], entry["version"]), entry) for entry in prompts)
+    tool_context.state[STATE_KEY_IMAGE_PROMPTS] = list(merged.values())
+
+    pending_ids = {idea.get("id", "") for idea in tool_context.state.get("pending_ideas") or []}
+    missing = sorted(pending_ids - {idea_id for idea_id, _ in merged})
+    if missing:
+        return (
+            f"Saved {len(prompts)} image prompts to state. "
+            f"Still missing prompts for: {', '.join(missing)}."
+        )
+    # All ideas are planned, which is the agent's whole output; end its turn
+    # without a summary call
+    tool_context.actions.skip_summarization = True
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for entry in prompts:
+            logger.debug(
+                "[save_image_prompts] %s v%s: %s",
+                entry["idea_id"],
+                entry["version"],
+                entry["prompt"],
+            )
 
-    tool_context.state[STATE_KEY_IMAGE_PROMPTS] = prompts
+    return f"Saved {len(prompts)} image prompts to state."
 
-    # Debug: print saved image prompts
-    print("\n" + "=" * 80)
-    print("[DEBUG] SAVED IMAGE PROMPTS:")
-    print("=" * 80)
-    for entry in prompts:
-        print(f"\n--- {entry['idea_id']} v{entry['version']} ---")
-        print(entry["prompt"])
-    print("=" * 80 + "\n")
 
-    return f"Saved {len(prompts)} image prompts to state."
+def summarize_saved_assets(results: list[dict]) -> str:
+    """Summarizes the image files generated for an idea.
 
+    Images are written to disk by the generation tools as they arrive, so
+    this only reports the paths recorded in the image results.
 
-def save_all_assets(tool_context: ToolContext) -> str:
-    """Reads generated image results from state and saves them all to disk.
+    Args:
+        results: Image result entries from ``STATE_KEY_IMAGE_RESULTS``.
 
     Returns:
         Summary of saved files.
     """
-    from agents.shared.schemas import STATE_KEY_IMAGE_RESULTS
-
-    results = tool_context.state.get(STATE_KEY_IMAGE_RESULTS)
     if not results:
         return "Error: no image results found in state."
 
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    saved = []
-    for entry in results:
-        idea_id = entry["idea_id"]
-        version = entry["version"]
-        image_b64 = entry["image_base64"]
-        filename = f"{idea_id}_v{version}.png"
-        output_path = OUTPUT_DIR / filename
-        image_bytes = base64.b64decode(image_b64)
-        with open(output_path, "wb") as f:
-            f.write(image_bytes)
-        saved.append(f"{filename} ({len(image_bytes)} bytes)")
-
+    saved = [Path(entry["path"]).name for entry in results]
     return f"Saved {len(saved)} images: {', '.join(saved)}"
 
-
-def save_asset(image_base64: str, idea_id: str, version: int) -> str:
-    """Saves a generated image asset to the output directory.
-
-    Args:
-        image_base64: Base64-encoded PNG image data.
-        idea_id: The ID of the post idea this image is for.
-        version: Version number of this image variation (1, 2, or 3).
-
-    Returns:
-        Confirmation message with the saved file path.
-    """
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    filename = f"{idea_id}_v{version}.png"
-    output_path = OUTPUT_DIR / filename
-
-    image_bytes = base64.b64decode(image_base64)
-    with open(output_path, "wb") as f:
-        f.write(image_bytes)
-
-    return f"Saved image to {output_path} ({len(image_bytes)} bytes)"
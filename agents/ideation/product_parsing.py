@@ -0,0 +1,115 @@
+"""Product file parsing for the Ideation tools.
+
+Kept free of ADK imports: catalog parse workers import only this module, so
+they start quickly and never pull in google.adk.
+"""
+
+import json
+import re
+from pathlib import Path
+
+PRODUCTS_DIR = Path(__file__).parent.parent.parent / "data" / "products"
+
+URL_SKU_RE = re.compile(r"-([A-Z0-9]{5,})$", re.IGNORECASE)
+PRICE_RE = re.compile(r"\$(\d+(?:\.\d{2})?)")
+
+
+def extract_category_from_url(url: str) -> str:
+    """Infer category (shoes/apparel/accessories) from URL."""
+    url_lower = url.lower()
+    # Checked in priority order, not in order of appearance in the URL
+    if "shoes" in url_lower:
+        return "shoes"
+    elif "apparel" in url_lower:
+        return "apparel"
+    elif "accessories" in url_lower:
+        return "accessories"
+    return "other"
+
+
+def resolve_local_assets(data: dict) -> list[str]:
+    """Resolve localAssets to absolute paths, filtering to files that exist."""
+    assets = []
+    for asset in data.get("localAssets", {}).get("assets", []):
+        local_path = asset.get("localPath", "")
+        if local_path:
+            abs_path = PRODUCTS_DIR / local_path
+            if abs_path.exists():
+                assets.append(str(abs_path))
+    return assets
+
+
+def extract_products_from_file(filepath: str) -> list[dict]:
+    """Extract product variants from a single product file."""
+    data = json.loads(Path(filepath).read_bytes())
+
+    local_assets = resolve_local_assets(data)
+
+    products = []
+    json_ld = data.get("structuredData", {}).get("jsonLd", [])
+
+    for ld in json_ld:
+        graph = ld.get("@graph", [])
+        for node in graph:
+            groups = []
+            if node.get("@type") == "ProductGroup":
+                groups.append(node)
+            elif node.get("@type") == "ItemList":
+                for list_item in node.get("itemListElement", []):
+                    item = list_item.get("item", {})
+                    if item.get("@type") == "ProductGroup":
+                        groups.append(item)
+
+            for group in groups:
+                group_name = group.get("name", "")
+                group_desc = group.get("description", "")
+                group_url = group.get("url", "")
+
+                for variant in group.get("hasVariant", []):
+                    sku = variant.get("sku", "")
+                    if not sku:
+                        continue
+                    offers = variant.get("offers", {})
+                    product_url = offers.get("url", group_url)
+                    products.append({
+                        "name": variant.get("name", ""),
+                        "sku": sku,
+                        "product_group": group_name,
+                        "description": group_desc,
+                        "color": variant.get("color", ""),
+                        "price": offers.get("price"),
+                        "image_url": variant.get("image", ""),
+                        "product_url": product_url,
+                        "category": extract_category_from_url(product_url),
+                        "local_assets": local_assets,
+                    })
+
+    # Fallback: if no structured data, try content fields
+    if not products:
+        url = data.get("url", "")
+        content = data.get("content", {})
+        name = content.get("name", "")
+        if name and name != "Shop all":
+            match = URL_SKU_RE.search(url.rstrip("/").split("/")[-1])
+            sku = match.group(1) if match else ""
+            if sku:
+                price = None
+                sku_field = content.get("sku", "")
+                price_match = PRICE_RE.search(sku_field)
+                if price_match:
+                    price = float(price_match.group(1))
+
+                products.append({
+                    "name": name,
+                    "sku": sku,
+                    "product_group": "",
+                    "description": "",
+                    "color": "",
+                    "price": price,
+                    "image_url": "",
+                    "product_url": url,
+                    "category": extract_category_from_url(url),
+                    "local_assets": local_assets,
+                })
+
+    return products
@@ -1,136 +1,193 @@
 """Tools for the Ideation agent."""
 
+import bisect
+import functools
 import glob
 import json
+import logging
+import multiprocessing
+import pickle
 import re
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import NamedTuple
 
 from google.adk.tools import ToolContext
 
+from agents.ideation.product_parsing import extract_products_from_file
+from agents.shared.files import write_atomic
+
+logger = logging.getLogger(__name__)
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 PRODUCT_INDEX_PATH = PROJECT_ROOT / "data" / "product_index.json"
-PRODUCTS_DIR = PROJECT_ROOT / "data" / "products"
+PRODUCT_INDEX_PICKLE_PATH = PRODUCT_INDEX_PATH.with_suffix(".pkl")
 COLLECTIONS_DIR = PROJECT_ROOT / "data" / "collections"
 OUTPUT_DIR = PROJECT_ROOT / "output"
+PRODUCTS_CACHE_PATH = PROJECT_ROOT / ".cache" / "products.pickle"
 
 _sku_index_cache: dict[str, str] | None = None
 _products_cache: list[dict] | None = None
+_search_index_cache: "_SearchIndex | None" = None
+_collections_cache: list[tuple[str, str, dict]] | None = None
+
+# One writer thread keeps ideas.json writes in call order; it is joined at exit
+_ideas_writer = ThreadPoolExecutor(max_workers=1)
+
+# Bump when the cached payload, or what extract_products_from_file or
+# _build_search_index produce, changes; caches with another version are rebuilt
+_PRODUCTS_CACHE_VERSION = 2
+
+# Below this many product files, worker start-up costs more than parsing inline
+_PARSE_POOL_MIN_FILES = 64
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
 
 def _load_sku_index() -> dict[str, str]:
-    """Load the SKU → file path index."""
+    """Load the SKU → file path index.
+
+    Prefers the pickled copy written by the index builder when it is at least
+    as new as the JSON, which skips decoding and parsing the JSON text.
+    """
     global _sku_index_cache
     if _sku_index_cache is None:
-        with open(PRODUCT_INDEX_PATH) as f:
-            _sku_index_cache = json.load(f)
+        try:
+            if PRODUCT_INDEX_PICKLE_PATH.stat().st_mtime >= PRODUCT_INDEX_PATH.stat().st_mtime:
+                _sku_index_cache = pickle.loads(PRODUCT_INDEX_PICKLE_PATH.read_bytes())
+                return _sku_index_cache
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        _sku_index_cache = json.loads(PRODUCT_INDEX_PATH.read_bytes())
     return _sku_index_cache
 
 
-def _extract_category_from_url(url: str) -> str:
-    """Infer category (shoes/apparel/accessories) from URL."""
-    url_lower = url.lower()
-    if "shoes" in url_lower:
-        return "shoes"
-    elif "apparel" in url_lower:
-        return "apparel"
-    elif "accessories" in url_lower:
-        return "accessories"
-    return "other"
-
-
-def _resolve_local_assets(data: dict) -> list[str]:
-    """Resolve localAssets to absolute paths, filtering to files that exist."""
-    assets = []
-    for asset in data.get("localAssets", {}).get("assets", []):
-        local_path = asset.get("localPath", "")
-        if local_path:
-            abs_path = PRODUCTS_DIR / local_path
-            if abs_path.exists():
-                assets.append(str(abs_path))
-    return assets
-
-
-def _extract_products_from_file(filepath: str) -> list[dict]:
-    """Extract product variants from a single product file."""
-    with open(filepath) as f:
-        data = json.load(f)
-
-    local_assets = _resolve_local_assets(data)
-
-    products = []
-    json_ld = data.get("structuredData", {}).get("jsonLd", [])
-
-    for ld in json_ld:
-        graph = ld.get("@graph", [])
-        for node in graph:
-            groups = []
-            if node.get("@type") == "ProductGroup":
-                groups.append(node)
-            elif node.get("@type") == "ItemList":
-                for list_item in node.get("itemListElement", []):
-                    item = list_item.get("item", {})
-                    if item.get("@type") == "ProductGroup":
-                        groups.append(item)
-
-            for group in groups:
-                group_name = group.get("name", "")
-                group_desc = group.get("description", "")
-                group_url = group.get("url", "")
-
-                for variant in group.get("hasVariant", []):
-                    sku = variant.get("sku", "")
-                    if not sku:
-                        continue
-                    offers = variant.get("offers", {})
-                    product_url = offers.get("url", group_url)
-                    products.append({
-                        "name": variant.get("name", ""),
-                        "sku": sku,
-                        "product_group": group_name,
-                        "description": group_desc,
-                        "color": variant.get("color", ""),
-                        "price": offers.get("price"),
-                        "image_url": variant.get("image", ""),
-                        "product_url": product_url,
-                        "category": _extract_category_from_url(product_url),
-                        "local_assets": local_assets,
-                    })
-
-    # Fallback: if no structured data, try content fields
-    if not products:
-        url = data.get("url", "")
-        content = data.get("content", {})
-        name = content.get("name", "")
-        if name and name != "Shop all":
-            match = re.search(r"-([A-Z0-9]{5,})$", url.rstrip("/").split("/")[-1], re.IGNORECASE)
-            sku = match.group(1) if match else ""
-            if sku:
-                price = None
-                sku_field = content.get("sku", "")
-                price_match = re.search(r"\$(\d+(?:\.\d{2})?)", sku_field)
-                if price_match:
-                    price = float(price_match.group(1))
-
-                products.append({
-                    "name": name,
-                    "sku": sku,
-                    "product_group": "",
-                    "description": "",
-                    "color": "",
-                    "price": price,
-                    "image_url": "",
-                    "product_url": url,
-                    "category": _extract_category_from_url(url),
-                    "local_assets": local_assets,
-                })
-
-    return products
+class _SearchIndex(NamedTuple):
+    """Lowercased searchable text of all products, laid out for C-level scans."""
+
+    text_blob: str  # every product's searchable text, newline-separated
+    text_starts: list[int]  # offset of each product's text in text_blob
+    token_blob: str  # every distinct token, newline-separated
+    token_starts: list[int]  # offset of each token in token_blob
+    postings: list[set[int]]  # product positions per token, aligned with token_starts
+
+
+def _join_with_offsets(texts: list[str]) -> tuple[str, list[int]]:
+    """Join texts with newlines, returning the blob and each text's start offset."""
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    return "\n".join(texts), starts
+
+
+def _find_all(keyword: str, blob: str, starts: list[int]) -> set[int]:
+    """Positions of the texts in ``blob`` that contain ``keyword``.
+
+    ``keyword`` must not contain a newline, so a match never spans two texts.
+    Each text is reported once: the scan resumes at the start of the next one.
+    """
+    found = set()
+    pos = blob.find(keyword)
+    while pos != -1:
+        i = bisect.bisect_right(starts, pos) - 1
+        found.add(i)
+        pos = blob.find(keyword, starts[i + 1]) if i + 1 < len(starts) else -1
+    return found
+
+
+def _build_search_index(products: list[dict]) -> _SearchIndex:
+    """Lowercase and tokenize every product's searchable fields once."""
+    searchables = [
+        " ".join([
+            product.get("name", ""),
+            product.get("product_group", ""),
+            product.get("description", ""),
+            product.get("color", ""),
+            product.get("category", ""),
+        ]).lower()
+        for product in products
+    ]
+    token_index: dict[str, set[int]] = defaultdict(set)
+    for i, searchable in enumerate(searchables):
+        for token in _TOKEN_RE.findall(searchable):
+            token_index[token].add(i)
+
+    text_blob, text_starts = _join_with_offsets(searchables)
+    token_blob, token_starts = _join_with_offsets(list(token_index))
+    return _SearchIndex(
+        text_blob, text_starts, token_blob, token_starts, list(token_index.values())
+    )
+
+
+def _read_products_cache(
+    source_paths: list[Path],
+) -> tuple[list[dict], _SearchIndex] | None:
+    """Return the persisted products and search index if newer than all sources."""
+    try:
+        cache_mtime = PRODUCTS_CACHE_PATH.stat().st_mtime
+        if any(path.stat().st_mtime > cache_mtime for path in source_paths):
+            return None
+        version, products, index_fields = pickle.loads(PRODUCTS_CACHE_PATH.read_bytes())
+        if version != _PRODUCTS_CACHE_VERSION:
+            return None
+        return products, _SearchIndex(*index_fields)
+    except Exception:
+        # Unreadable, truncated or written by another layout: rebuild it
+        return None
+
+
+def _write_products_cache(products: list[dict], search_index: _SearchIndex) -> None:
+    """Persist the products and search index so later processes skip rebuilding them."""
+    try:
+        PRODUCTS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(
+            PRODUCTS_CACHE_PATH,
+            pickle.dumps(
+                # Plain tuples only, so no class layout is baked into the pickle
+                (_PRODUCTS_CACHE_VERSION, products, tuple(search_index)),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            ),
+        )
+    except OSError:
+        pass
+
+
+@functools.cache
+def _parse_pool_context() -> multiprocessing.context.BaseContext:
+    """Start method for catalog parse workers.
+
+    Tools run inside multi-threaded processes (run.py's log listener, the
+    web server), where fork() can deadlock, so workers come from a
+    single-threaded forkserver, or spawn where that is unavailable. The
+    worker function lives in the ADK-free parsing module, which the server
+    preloads. Workers still re-import ``__main__`` as multiprocessing
+    requires; that happens in parallel and at most once per catalog change,
+    since the parsed catalog is cached.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["agents.ideation.product_parsing"])
+        return context
+    return multiprocessing.get_context("spawn")
 
 
 def _load_all_products() -> list[dict]:
-    """Load and cache all product data from product files."""
-    global _products_cache
+    """Load and cache all product data from product files.
+
+    The search index is built in the same pass, so queries never lowercase or
+    tokenize product fields. Both are persisted to ``PRODUCTS_CACHE_PATH`` and
+    reused by later processes until the index or any product file changes.
+
+    Adding or deleting product photos does not invalidate the cache, so each
+    product's ``local_assets`` lists the photos present when it was parsed.
+    Nothing reads them from here: ``get_product_details`` re-parses the
+    product's file and reports the photos present now.
+    """
+    global _products_cache, _search_index_cache
     if _products_cache is not None:
         return _products_cache
 
@@ -138,20 +195,75 @@ def _load_all_products() -> list[dict]:
     # Get unique file paths from the index
     unique_paths = set(sku_index.values())
 
+    source_paths = [PRODUCT_INDEX_PATH, *(PROJECT_ROOT / p for p in unique_paths)]
+    cached = _read_products_cache(source_paths)
+    if cached is not None:
+        _products_cache, _search_index_cache = cached
+        return _products_cache
+
+    filepaths = [str(PROJECT_ROOT / rel_path) for rel_path in sorted(unique_paths)]
+    if len(filepaths) >= _PARSE_POOL_MIN_FILES:
+        # Parsing is CPU-bound; fan the files out across cores, keeping file order
+        with ProcessPoolExecutor(mp_context=_parse_pool_context()) as pool:
+            parsed = list(pool.map(extract_products_from_file, filepaths, chunksize=16))
+    else:
+        parsed = [extract_products_from_file(filepath) for filepath in filepaths]
+
     all_products: list[dict] = []
     seen_skus: set[str] = set()
 
-    for rel_path in sorted(unique_paths):
-        filepath = str(PROJECT_ROOT / rel_path)
-        for product in _extract_products_from_file(filepath):
+    for products in parsed:
+        for product in products:
             if product["sku"] not in seen_skus:
                 seen_skus.add(product["sku"])
                 all_products.append(product)
 
-    _products_cache = all_products
+    search_index = _build_search_index(all_products)
+    _write_products_cache(all_products, search_index)
+    _products_cache, _search_index_cache = all_products, search_index
     return _products_cache
 
 
+def _load_search_index() -> _SearchIndex:
+    """Return the search index built alongside the product list."""
+    _load_all_products()
+    return _search_index_cache
+
+
+def _match_keyword(keyword: str, index: _SearchIndex) -> set[int]:
+    """Positions of the products whose searchable text contains ``keyword``."""
+    if _TOKEN_RE.fullmatch(keyword):
+        # An alphanumeric keyword can only occur inside a single token
+        tokens = _find_all(keyword, index.token_blob, index.token_starts)
+        return set().union(*(index.postings[i] for i in tokens))
+    return _find_all(keyword, index.text_blob, index.text_starts)
+
+
+def _load_collections() -> list[tuple[str, str, dict]]:
+    """Load collection summaries with their lowercased title and description.
+
+    Lowercasing happens once here, so failed searches only run ``in`` checks.
+    """
+    global _collections_cache
+    if _collections_cache is None:
+        collections = []
+        for cpath in sorted(glob.glob(str(COLLECTIONS_DIR / "*.json"))):
+            cdata = json.loads(Path(cpath).read_bytes())
+            metadata = cdata.get("metadata", {})
+            og = metadata.get("openGraph", {})
+            content = cdata.get("content", {})
+            title = content.get("title") or og.get("og:title") or metadata.get("title", "")
+            description = og.get("og:description") or metadata.get("description", "")
+            collections.append((title.lower(), description.lower(), {
+                "name": title,
+                "description": description,
+                "url": cdata.get("url", ""),
+                "image_url": og.get("og:image", ""),
+            }))
+        _collections_cache = collections
+    return _collections_cache
+
+
 def read_mood_board(path: str) -> str:
     """Reads a mood board markdown file and returns its contents.
 
@@ -166,38 +278,24 @@ def read_mood_board(path: str) -> str:
         return f.read()
 
 
-def search_products(query: str) -> str:
-    """Searches the product catalog by keyword and returns matching products.
-
-    Use this to find specific products from the On catalog that match the
-    mood board's themes or product requirements. Search by product name,
-    category, color, or description.
-
-    Args:
-        query: Search query string (e.g. "Cloud 6", "running shoes", "black apparel").
-
-    Returns:
-        JSON string with matching products (max 20 results).
-    """
+@functools.lru_cache(maxsize=256)
+def _search_products(query: str) -> str:
+    """Cached body of ``search_products``; the catalog never changes in-process."""
     products = _load_all_products()
+    index = _load_search_index()
     query_lower = query.lower()
-    keywords = query_lower.split()
-
-    matches = []
-    for product in products:
-        searchable = " ".join([
-            product.get("name", ""),
-            product.get("product_group", ""),
-            product.get("description", ""),
-            product.get("color", ""),
-            product.get("category", ""),
-        ]).lower()
-
-        if all(kw in searchable for kw in keywords):
-            matches.append(product)
-
-        if len(matches) >= 20:
+    # Each distinct keyword once, longest (usually most selective) first
+    keywords = sorted(dict.fromkeys(query_lower.split()), key=len, reverse=True)
+    if not keywords:
+        return json.dumps({"query": query, "match_count": 0, "products": []})
+
+    # Intersect posting sets keyword by keyword
+    hits = _match_keyword(keywords[0], index)
+    for kw in keywords[1:]:
+        if not hits:
             break
+        hits &= _match_keyword(kw, index)
+    matches = [products[i] for i in sorted(hits)[:20]]
 
     result = {
         "query": query,
@@ -206,30 +304,34 @@ def search_products(query: str) -> str:
     }
 
     if not matches:
-        # Search collection files directly for context
+        # Search collections for context
         matching_collections = []
-        collection_files = sorted(glob.glob(str(COLLECTIONS_DIR / "*.json")))
-        for cpath in collection_files:
-            with open(cpath) as f:
-                cdata = json.load(f)
-            metadata = cdata.get("metadata", {})
-            og = metadata.get("openGraph", {})
-            content = cdata.get("content", {})
-            title = content.get("title") or og.get("og:title") or metadata.get("title", "")
-            description = og.get("og:description") or metadata.get("description", "")
-            if query_lower in title.lower() or query_lower in description.lower():
-                matching_collections.append({
-                    "name": title,
-                    "description": description,
-                    "url": cdata.get("url", ""),
-                    "image_url": og.get("og:image", ""),
-                })
-            if len(matching_collections) >= 5:
-                break
+        for title_lower, description_lower, collection in _load_collections():
+            if query_lower in title_lower or query_lower in description_lower:
+                matching_collections.append(collection)
+                if len(matching_collections) >= 5:
+                    break
         if matching_collections:
             result["related_collections"] = matching_collections
 
-    return json.dumps(result, indent=2)
+    # Compact: the result goes straight to the model, indentation only costs tokens
+    return json.dumps(result, separators=(",", ":"))
+
+
+def search_products(query: str) -> str:
+    """Searches the product catalog by keyword and returns matching products.
+
+    Use this to find specific products from the On catalog that match the
+    mood board's themes or product requirements. Search by product name,
+    category, color, or description.
+
+    Args:
+        query: Search query string (e.g. "Cloud 6", "running shoes", "black apparel").
+
+    Returns:
+        JSON string with matching products (max 20 results).
+    """
+    return _search_products(query)
 
 
 def get_product_details(sku: str) -> str:
@@ -250,7 +352,7 @@ def get_product_details(sku: str) -> str:
         return json.dumps({"error": f"SKU not found: {sku}"})
 
     filepath = str(PROJECT_ROOT / rel_path)
-    products = _extract_products_from_file(filepath)
+    products = extract_products_from_file(filepath)
     matched = next((p for p in products if p["sku"] == sku), None)
     if matched is None:
         return json.dumps({"error": f"SKU not found: {sku}"})
@@ -263,6 +365,13 @@ def get_product_details(sku: str) -> str:
     }, indent=2)
 
 
+def _log_failed_ideas_write(write: Future) -> None:
+    """Logs a failed background write of ideas.json (state still holds the ideas)."""
+    error = write.exception()
+    if error is not None:
+        logger.error("[save_ideas] Failed to write ideas.json: %s", error)
+
+
 def save_ideas(ideas_json: str, tool_context: ToolContext) -> str:
     """Validates and saves the generated post ideas to output/ideas.json.
 
@@ -291,19 +400,18 @@ def save_ideas(ideas_json: str, tool_context: ToolContext) -> str:
     """
     from agents.shared.schemas import IdeasOutput, STATE_KEY_IDEAS
 
-    data = json.loads(ideas_json)
-    data["generated_at"] = datetime.now(timezone.utc).isoformat()
-    # Validate against schema
-    validated = IdeasOutput(**data)
+    # Parse and validate against the schema in one pass
+    validated = IdeasOutput.model_validate_json(ideas_json)
+    validated.generated_at = datetime.now(timezone.utc).isoformat()
     validated_dict = validated.model_dump()
 
     # Store in session state for downstream agents
     tool_context.state[STATE_KEY_IDEAS] = validated_dict
 
-    # Also write to filesystem as a debug artifact
+    # Also write to filesystem as a debug artifact, off the tool's critical path
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     output_path = OUTPUT_DIR / "ideas.json"
-    with open(output_path, "w") as f:
-        json.dump(validated_dict, f, indent=2)
+    write = _ideas_writer.submit(output_path.write_text, validated.model_dump_json())
+    write.add_done_callback(_log_failed_ideas_write)
 
     return f"Saved {len(validated.ideas)} ideas to {output_path}"
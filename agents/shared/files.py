@@ -0,0 +1,21 @@
+"""File helpers shared by the agents' on-disk caches."""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Writes ``data`` to ``path`` so concurrent readers never see a partial file.
+
+    The data goes to a uniquely named temporary file next to ``path`` first,
+    so concurrent writers of the same path never clobber each other's file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,45 @@
+"""Non-blocking logging setup for the pipeline entry points."""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging() -> None:
+    """Routes root-logger output through a QueueHandler/QueueListener pair.
+
+    Callers only enqueue log records; formatting and stream I/O happen on the
+    listener's background thread, so logging from tools and agents never
+    blocks the asyncio event loop. Handlers already attached to the root
+    logger are moved behind the queue. The root level comes from the
+    ``LOG_LEVEL`` environment variable (default ``WARNING``, as in logging
+    itself), so records below it are dropped before they are queued.
+    Calling this more than once is a no-op.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    root = logging.getLogger()
+    root.setLevel(os.environ.get("LOG_LEVEL", "WARNING").upper())
+    handlers = root.handlers[:]
+    if not handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+        handlers = [stream_handler]
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
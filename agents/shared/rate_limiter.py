@@ -0,0 +1,74 @@
+"""Async token-bucket rate limiting for model calls made by concurrent agents."""
+
+import asyncio
+import os
+import time
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+
+class AsyncTokenBucket:
+    """Lets at most ``rate_per_min`` calls through per minute, ``burst`` back to back.
+
+    Use as ``async with bucket:`` around a model call. Waiters are served in
+    arrival order; a rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate_per_min: float, burst: int = 1) -> None:
+        self.rate_per_min = rate_per_min
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # asyncio primitives are bound to one loop; recreate for a new one
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate_per_min / 60
+        )
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        if self.rate_per_min <= 0:
+            return
+        async with self._get_lock():
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * 60 / self.rate_per_min)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self) -> "AsyncTokenBucket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
+# Requests per minute per model; set to 0 to disable limiting.
+image_model_bucket = AsyncTokenBucket(
+    float(os.environ.get("IMAGE_MODEL_RPM", "60")), burst=3
+)
+text_model_bucket = AsyncTokenBucket(
+    float(os.environ.get("TEXT_MODEL_RPM", "300")), burst=5
+)
+
+
+async def throttle_text_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> LlmResponse | None:
+    """``before_model_callback`` that waits for a text-model token."""
+    await text_model_bucket.acquire()
+    return None
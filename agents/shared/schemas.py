@@ -1,6 +1,6 @@
 """Shared Pydantic models for the JSON contract between agents."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class PostIdea(BaseModel):
@@ -14,12 +14,24 @@ class PostIdea(BaseModel):
     mood: str
 
 
+class ImagePrompt(BaseModel):
+    idea_id: str
+    version: int
+    prompt: str
+
+
+# Validates a JSON list of prompts in one pass, without an intermediate json.loads
+IMAGE_PROMPTS_ADAPTER = TypeAdapter(list[ImagePrompt])
+
+
 class IdeasOutput(BaseModel):
     mood_board_source: str
-    generated_at: str
+    generated_at: str = ""  # stamped by save_ideas
     ideas: list[PostIdea]
 
 
 STATE_KEY_IDEAS = "ideas_output"
 STATE_KEY_IMAGE_PROMPTS = "image_prompts"
 STATE_KEY_IMAGE_RESULTS = "image_results"
+STATE_KEY_LAST_FINISH_REASON = "last_finish_reason"
+STATE_KEY_LAST_ERROR_CODE = "last_error_code"
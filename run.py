@@ -9,7 +9,8 @@ from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
-from agents.agent import root_agent
+from agents.agent import app
+from agents.shared.logging_setup import configure_logging
 
 load_dotenv()
 
@@ -21,14 +22,10 @@ async def main(mood_board_path: str) -> None:
         sys.exit(1)
 
     session_service = InMemorySessionService()
-    runner = Runner(
-        agent=root_agent,
-        app_name="instagram_post_generator",
-        session_service=session_service,
-    )
+    runner = Runner(app=app, session_service=session_service)
 
     session = await session_service.create_session(
-        app_name="instagram_post_generator",
+        app_name=app.name,
         user_id="cli_user",
     )
 
@@ -56,4 +53,5 @@ if __name__ == "__main__":
         print(f"Usage: {sys.argv[0]} <mood_board.md>", file=sys.stderr)
         sys.exit(1)
 
+    configure_logging()
     asyncio.run(main(sys.argv[1]))
@@ -2,20 +2,25 @@
 """Build a lightweight SKU → file path index from scraped product data."""
 
 import json
-import glob
 import re
 import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 PRODUCTS_DIR = DATA_DIR / "products"
 OUTPUT_PATH = DATA_DIR / "product_index.json"
+# Binary copy of the index; the tools load it instead of reparsing the JSON
+PICKLE_PATH = OUTPUT_PATH.with_suffix(".pkl")
+
+# Filename pattern: products-...-SKU.json
+_SKU_FILENAME_RE = re.compile(r"-([A-Z0-9]{5,})\.json$", re.IGNORECASE)
 
 
 def extract_sku_from_filename(filename: str) -> str | None:
     """Extract SKU identifier from a product filename as fallback."""
-    # Filename pattern: products-...-SKU.json
-    match = re.search(r"-([A-Z0-9]{5,})\.json$", filename, re.IGNORECASE)
+    match = _SKU_FILENAME_RE.search(filename)
     if match:
         return match.group(1)
     return None
@@ -45,36 +50,50 @@ def extract_skus_from_structured_data(data: dict) -> list[str]:
     return skus
 
 
+def extract_skus_from_file(filepath: str) -> list[str]:
+    """Extract the SKUs of one product file, falling back to its filename."""
+    with open(filepath, "rb") as f:
+        raw = f.read()
+
+    # Only files with a ProductGroup variant can yield SKUs; skip parsing the rest
+    if b'"ProductGroup"' in raw and b'"hasVariant"' in raw:
+        skus = extract_skus_from_structured_data(json.loads(raw))
+        if skus:
+            return skus
+
+    # Fallback: extract SKU from filename
+    sku = extract_sku_from_filename(os.path.basename(filepath))
+    return [sku] if sku else []
+
+
 def main():
     print("Building product index...")
 
-    product_files = sorted(glob.glob(str(PRODUCTS_DIR / "*.json")))
+    # Sorted so the first file listing a SKU wins deterministically
+    product_files = sorted(
+        entry.path
+        for entry in os.scandir(PRODUCTS_DIR)
+        if entry.name.endswith(".json") and entry.is_file()
+    )
     print(f"Found {len(product_files)} product files")
 
-    index: dict[str, str] = {}
-
-    for filepath in product_files:
-        rel_path = os.path.relpath(filepath, DATA_DIR.parent)
-        with open(filepath) as f:
-            data = json.load(f)
+    # Parsing is CPU-bound and independent per file; fan it out across cores
+    with ProcessPoolExecutor() as pool:
+        file_skus = pool.map(extract_skus_from_file, product_files, chunksize=32)
 
-        skus = extract_skus_from_structured_data(data)
-
-        if skus:
+        index: dict[str, str] = {}
+        for filepath, skus in zip(product_files, file_skus):
+            rel_path = os.path.relpath(filepath, DATA_DIR.parent)
             for sku in skus:
                 if sku not in index:
                     index[sku] = rel_path
-        else:
-            # Fallback: extract SKU from filename
-            sku = extract_sku_from_filename(os.path.basename(filepath))
-            if sku and sku not in index:
-                index[sku] = rel_path
 
     print(f"Indexed {len(index)} SKUs from {len(product_files)} files")
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(index, f, indent=2)
+    # Compact separators: the index is only read by the tools, so skip indentation
+    OUTPUT_PATH.write_text(json.dumps(index, separators=(",", ":")))
+    PICKLE_PATH.write_bytes(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
 
     size_kb = os.path.getsize(OUTPUT_PATH) / 1024
     print(f"Written to {OUTPUT_PATH} ({size_kb:.0f} KB)")
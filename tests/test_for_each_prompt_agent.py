@@ -0,0 +1,114 @@
+"""Tests for ForEachPromptAgent's per-prompt fallback after the batched image call."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from google.adk.agents import BaseAgent
+
+import agents.assets_generator.agent as assets_agent
+from agents.assets_generator.agent import ForEachPromptAgent
+from agents.shared.schemas import STATE_KEY_IMAGE_PROMPTS, STATE_KEY_IMAGE_RESULTS
+
+PROMPTS = [
+    {"idea_id": "idea_1", "version": version, "prompt": f"Prompt {version}"}
+    for version in (1, 2, 3)
+]
+
+
+def _result(version: int) -> dict:
+    return {"idea_id": "idea_1", "version": version, "path": f"output/idea_1_v{version}.png"}
+
+
+class ScriptedImageGenerator(BaseAgent):
+    """Stores an image result for ``current_prompt`` unless its version is in ``failing``."""
+
+    failing: set[int] = set()
+    calls: list[int] = []
+
+    async def run_async(self, parent_context):
+        state = parent_context.session.state
+        version = state["current_prompt"]["version"]
+        self.calls.append(version)
+        if STATE_KEY_IMAGE_RESULTS in state:
+            raise AssertionError("prompt context inherited the idea's results")
+        if version not in self.failing:
+            await asyncio.sleep(0)
+            state[STATE_KEY_IMAGE_RESULTS] = [_result(version)]
+        return
+        yield
+
+
+def _fork_context(ctx, branch: str, **state):
+    """Stands in for the InvocationContext copy: a fresh state dict per fork."""
+    fork = MagicMock()
+    fork.branch = branch
+    fork.session.state = {**ctx.session.state, **state}
+    return fork
+
+
+@pytest.fixture(autouse=True)
+def fake_fork(monkeypatch):
+    monkeypatch.setattr(assets_agent, "_fork_context", _fork_context)
+
+
+def _run(
+    state: dict, failing: frozenset[int] = frozenset()
+) -> tuple[ScriptedImageGenerator, dict]:
+    """Runs a ForEachPromptAgent over ``state`` and returns the generator and final state."""
+    generator = ScriptedImageGenerator(name="image_generator", failing=set(failing))
+    agent = ForEachPromptAgent(name="for_each_prompt", sub_agents=[generator], max_parallel=2)
+    ctx = MagicMock()
+    ctx.session.state = {"current_idea": {"id": "idea_1", "product_image_urls": []}, **state}
+
+    async def run() -> None:
+        async for _ in agent._run_async_impl(ctx):
+            pass
+
+    asyncio.run(run())
+    return generator, ctx.session.state
+
+
+# ---------------------------------------------------------------------------
+# ForEachPromptAgent tests
+# ---------------------------------------------------------------------------
+
+
+class TestForEachPromptAgent:
+    def test_generates_every_prompt_without_batch_results(self):
+        generator, state = _run({STATE_KEY_IMAGE_PROMPTS: PROMPTS})
+
+        assert sorted(generator.calls) == [1, 2, 3]
+        assert state[STATE_KEY_IMAGE_RESULTS] == [_result(1), _result(2), _result(3)]
+
+    def test_generates_only_prompts_the_batch_missed(self):
+        generator, state = _run({
+            STATE_KEY_IMAGE_PROMPTS: PROMPTS,
+            STATE_KEY_IMAGE_RESULTS: [_result(2)],
+        })
+
+        assert sorted(generator.calls) == [1, 3]
+        assert state[STATE_KEY_IMAGE_RESULTS] == [_result(1), _result(2), _result(3)]
+
+    def test_skips_generation_when_batch_covered_everything(self):
+        results = [_result(3), _result(1), _result(2)]
+
+        generator, state = _run({
+            STATE_KEY_IMAGE_PROMPTS: PROMPTS,
+            STATE_KEY_IMAGE_RESULTS: results,
+        })
+
+        assert generator.calls == []
+        assert state[STATE_KEY_IMAGE_RESULTS] == [_result(1), _result(2), _result(3)]
+
+    def test_leaves_out_prompts_that_got_no_image(self):
+        generator, state = _run({STATE_KEY_IMAGE_PROMPTS: PROMPTS}, failing={2})
+
+        assert sorted(generator.calls) == [1, 2, 3]
+        assert state[STATE_KEY_IMAGE_RESULTS] == [_result(1), _result(3)]
+
+    def test_no_prompts(self):
+        generator, state = _run({})
+
+        assert generator.calls == []
+        assert state[STATE_KEY_IMAGE_RESULTS] == []
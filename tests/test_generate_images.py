@@ -0,0 +1,200 @@
+"""Tests for generate_images, the batched image call for all prompts of an idea."""
+
+import asyncio
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from google.genai import types
+
+import agents.assets_generator.tools as assets_tools
+from agents.assets_generator.tools import generate_images
+from agents.shared.schemas import STATE_KEY_IMAGE_PROMPTS, STATE_KEY_IMAGE_RESULTS
+
+PROMPTS = [
+    {"idea_id": "idea_1", "version": version, "prompt": f"Shoe shot {version}"}
+    for version in (1, 2, 3)
+]
+
+
+def _response(*parts: types.Part) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def _image(data: bytes) -> types.Part:
+    return types.Part.from_bytes(data=data, mime_type="image/png")
+
+
+class FakeModel:
+    """Replaces _generate_content: records each call and returns scripted responses."""
+
+    def __init__(self) -> None:
+        self.calls: list[list] = []
+        self.responses: list = []
+
+    async def __call__(self, contents: list) -> types.GenerateContentResponse:
+        self.calls.append(contents)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+async def _no_reference_parts(image_paths: tuple[str, ...]) -> tuple:
+    return ()
+
+
+@pytest.fixture()
+def model(tmp_path, monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(assets_tools, "_generate_content", fake)
+    monkeypatch.setattr(assets_tools, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(assets_tools, "IMAGE_CACHE_DIR", tmp_path / "images")
+    return fake
+
+
+def _run(prompts: list[dict], **state) -> tuple[str, dict]:
+    """Runs generate_images over ``prompts`` and returns its message and the final state."""
+    tool_context = MagicMock()
+    tool_context.state = {
+        STATE_KEY_IMAGE_PROMPTS: prompts,
+        "current_idea": {"id": "idea_1", "product_image_urls": []},
+        **state,
+    }
+    message = asyncio.run(generate_images(tool_context))
+    return message, tool_context.state
+
+
+def _saved(state: dict) -> dict[int, bytes]:
+    """Maps each result's version to the bytes written for it."""
+    return {
+        result["version"]: open(result["path"], "rb").read()
+        for result in state[STATE_KEY_IMAGE_RESULTS]
+    }
+
+
+# ---------------------------------------------------------------------------
+# generate_images tests
+# ---------------------------------------------------------------------------
+
+
+class TestGenerateImages:
+    def test_sends_all_prompts_in_one_call(self, model):
+        model.responses = [_response(_image(b"1"), _image(b"2"), _image(b"3"))]
+
+        _run(PROMPTS)
+
+        assert len(model.calls) == 1
+        prompt_text = model.calls[0][0]
+        assert "Generate exactly 3 images" in prompt_text
+        assert prompt_text.index("Shoe shot 1") < prompt_text.index("Shoe shot 2")
+        assert prompt_text.index("Shoe shot 2") < prompt_text.index("Shoe shot 3")
+
+    def test_maps_images_to_prompts_in_order(self, model):
+        model.responses = [
+            _response(
+                types.Part.from_text(text="Here you go"),
+                _image(b"1"),
+                _image(b"2"),
+                types.Part.from_text(text="and"),
+                _image(b"3"),
+            )
+        ]
+
+        message, state = _run(PROMPTS)
+
+        assert _saved(state) == {1: b"1", 2: b"2", 3: b"3"}
+        assert message == "Generated 3 of 3 images in one call (0 reused from cache)."
+
+    def test_leaves_trailing_prompts_without_image(self, model):
+        model.responses = [_response(_image(b"1"), _image(b"2"))]
+
+        message, state = _run(PROMPTS)
+
+        assert _saved(state) == {1: b"1", 2: b"2"}
+        assert message.startswith("Generated 2 of 3 images")
+
+    def test_ignores_extra_images(self, model):
+        model.responses = [_response(*(_image(bytes([i])) for i in range(5)))]
+
+        _, state = _run(PROMPTS[:2])
+
+        assert _saved(state) == {1: b"\x00", 2: b"\x01"}
+
+    def test_api_error_is_reported(self, model):
+        model.responses = [RuntimeError("quota")]
+
+        message, state = _run(PROMPTS)
+
+        assert message == "Error: API call failed — quota"
+        assert state[STATE_KEY_IMAGE_RESULTS] == []
+
+    def test_no_prompts(self, model):
+        message, _ = _run([])
+
+        assert message == "Error: no image prompts found in state."
+        assert model.calls == []
+
+    def test_only_duplicate_prompts(self, model):
+        message, _ = _run([], duplicate_prompts=PROMPTS[:1])
+
+        assert message == "All prompts reuse images generated for earlier ideas."
+        assert model.calls == []
+
+
+# ---------------------------------------------------------------------------
+# Image cache tests
+# ---------------------------------------------------------------------------
+
+
+class TestImageCache:
+    def test_rerun_reuses_cached_images_without_a_call(self, model):
+        model.responses = [_response(_image(b"1"), _image(b"2"), _image(b"3"))]
+        _run(PROMPTS)
+
+        message, state = _run([{**entry, "idea_id": "idea_9"} for entry in PROMPTS])
+
+        assert len(model.calls) == 1
+        assert message == "Reused 3 cached images."
+        assert _saved(state) == {1: b"1", 2: b"2", 3: b"3"}
+
+    def test_sends_only_uncached_prompts_and_maps_images_to_them(self, model):
+        model.responses = [_response(_image(b"2"))]
+        _run(PROMPTS[1:2])
+        model.responses = [_response(_image(b"1"), _image(b"3"))]
+
+        message, state = _run(PROMPTS)
+
+        assert "Generate exactly 2 images" in model.calls[1][0]
+        assert "Shoe shot 2" not in model.calls[1][0]
+        assert _saved(state) == {1: b"1", 2: b"2", 3: b"3"}
+        assert message == "Generated 2 of 2 images in one call (1 reused from cache)."
+
+    def test_other_image_model_is_a_miss(self, model, monkeypatch):
+        model.responses = [_response(_image(b"old"))]
+        _run(PROMPTS[:1])
+        monkeypatch.setattr(assets_tools, "IMAGE_MODEL", "another-image-model")
+        model.responses = [_response(_image(b"new"))]
+
+        _, state = _run(PROMPTS[:1])
+
+        assert len(model.calls) == 2
+        assert _saved(state) == {1: b"new"}
+
+    def test_edited_reference_photo_is_a_miss(self, model, tmp_path, monkeypatch):
+        monkeypatch.setattr(assets_tools, "_load_reference_parts", _no_reference_parts)
+        photo = tmp_path / "shoe.jpg"
+        photo.write_bytes(b"photo")
+        idea = {"id": "idea_1", "product_image_urls": [str(photo)]}
+        model.responses = [_response(_image(b"old"))]
+        _run(PROMPTS[:1], current_idea=idea)
+        stat = photo.stat()
+        os.utime(photo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        model.responses = [_response(_image(b"new"))]
+
+        _, state = _run(PROMPTS[:1], current_idea=idea)
+
+        assert len(model.calls) == 2
+        assert _saved(state) == {1: b"new"}
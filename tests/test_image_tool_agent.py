@@ -0,0 +1,61 @@
+"""Tests for ImageToolAgent, which runs an image tool without an LLM turn."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from agents.assets_generator.image_tool_agent import ImageToolAgent
+from agents.shared.schemas import STATE_KEY_IMAGE_RESULTS
+
+IMAGE_RESULT = {"idea_id": "idea_1", "version": 1, "path": "output/idea_1_v1.png"}
+
+
+async def _store_result(tool_context) -> str:
+    """Stands in for an image tool: stores one result and reports it."""
+    prompt = tool_context.state["current_prompt"]
+    tool_context.state[STATE_KEY_IMAGE_RESULTS] = [IMAGE_RESULT]
+    return f"Generated image for {prompt['idea_id']} v{prompt['version']}."
+
+
+def _run(tool) -> tuple[list, dict]:
+    """Runs an ImageToolAgent with ``tool`` and returns its events and the session state."""
+    agent = ImageToolAgent(name="image_generator", tool=tool)
+    ctx = MagicMock()
+    ctx.invocation_id = "invocation_1"
+    ctx.branch = "for_each_idea.idea_1"
+    ctx.session.state = {"current_prompt": {"idea_id": "idea_1", "version": 1}}
+
+    async def run() -> list:
+        return [event async for event in agent._run_async_impl(ctx)]
+
+    return asyncio.run(run()), ctx.session.state
+
+
+# ---------------------------------------------------------------------------
+# ImageToolAgent tests
+# ---------------------------------------------------------------------------
+
+
+class TestImageToolAgent:
+    def test_yields_the_tools_message_as_one_event(self):
+        events, _ = _run(_store_result)
+
+        assert len(events) == 1
+        assert events[0].content.parts[0].text == "Generated image for idea_1 v1."
+        assert events[0].author == "image_generator"
+        assert events[0].invocation_id == "invocation_1"
+        assert events[0].branch == "for_each_idea.idea_1"
+
+    def test_tool_state_changes_reach_session_and_event(self):
+        events, state = _run(_store_result)
+
+        assert state[STATE_KEY_IMAGE_RESULTS] == [IMAGE_RESULT]
+        assert events[0].actions.state_delta == {STATE_KEY_IMAGE_RESULTS: [IMAGE_RESULT]}
+
+    def test_tool_errors_propagate(self):
+        async def failing_tool(tool_context) -> str:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            _run(failing_tool)
@@ -0,0 +1,82 @@
+"""Tests for _merge_runs, the concurrent event merge behind the ForEach agents."""
+
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+from agents.assets_generator.agent import _merge_runs
+
+
+async def _events(name: str, count: int, log: list[str], fail: bool = False):
+    """Yields ``count`` events, logging when it runs and when it is closed."""
+    log.append(f"start {name}")
+    try:
+        for i in range(count):
+            await asyncio.sleep(0)
+            yield f"{name}{i}"
+        if fail:
+            raise KeyError(name)
+    finally:
+        log.append(f"close {name}")
+
+
+async def _collect(runs, max_parallel: int) -> list[str]:
+    return [event async for event in _merge_runs(runs, max_parallel)]
+
+
+# ---------------------------------------------------------------------------
+# _merge_runs tests
+# ---------------------------------------------------------------------------
+
+
+class TestMergeRuns:
+    def test_yields_every_event_in_each_runs_order(self):
+        log = []
+
+        events = asyncio.run(_collect([_events("a", 3, log), _events("b", 2, log)], 2))
+
+        assert sorted(events) == ["a0", "a1", "a2", "b0", "b1"]
+        assert [e for e in events if e.startswith("a")] == ["a0", "a1", "a2"]
+
+    def test_interleaves_concurrent_runs(self):
+        log = []
+
+        events = asyncio.run(_collect([_events("a", 3, log), _events("b", 3, log)], 2))
+
+        # Each run waits for its event to be consumed, so the other one goes next
+        assert set(events[:2]) == {"a0", "b0"}
+
+    def test_limits_runs_in_flight(self):
+        log = []
+
+        asyncio.run(_collect([_events(name, 2, log) for name in "abc"], 1))
+
+        assert log == ["start a", "close a", "start b", "close b", "start c", "close c"]
+
+    def test_no_runs(self):
+        assert asyncio.run(_collect([], 3)) == []
+
+    def test_reraises_run_error_and_closes_the_others(self):
+        log = []
+
+        with pytest.raises(KeyError):
+            asyncio.run(_collect([_events("a", 1, log, fail=True), _events("b", 50, log)], 2))
+
+        assert "close b" in log
+
+    def test_early_close_closes_runs_before_returning(self):
+        log = []
+
+        async def consume_one() -> None:
+            runs = [_events("a", 5, log), _events("b", 5, log), _events("c", 5, log)]
+            async with aclosing(_merge_runs(runs, 2)) as merged:
+                async for _ in merged:
+                    break
+            log.append("merge closed")
+
+        asyncio.run(consume_one())
+
+        # "c" never got a slot, so it never started and has nothing to clean up
+        assert sorted(log[:-1]) == ["close a", "close b", "start a", "start b"]
+        assert log[-1] == "merge closed"
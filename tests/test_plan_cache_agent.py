@@ -0,0 +1,127 @@
+"""Tests for PlanCacheAgent's per-idea plan cache hits and misses."""
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from google.adk.agents import BaseAgent
+
+from agents.assets_generator.plan_cache_agent import PlanCacheAgent, plan_key
+from agents.shared.schemas import STATE_KEY_IDEAS, STATE_KEY_IMAGE_PROMPTS
+
+IDEAS = [
+    {"id": "idea_1", "product_sku": "SKU1", "imagery_direction": "Track at dawn", "mood": "calm"},
+    {"id": "idea_2", "product_sku": "SKU2", "imagery_direction": "City rooftop", "mood": "bold"},
+]
+
+
+class FakePlanner(BaseAgent):
+    """Plans two prompts per pending idea and records which ideas it was given."""
+
+    planned: list[list[str]] = []
+
+    async def run_async(self, parent_context):
+        pending = parent_context.session.state["pending_ideas"]
+        self.planned.append([idea["id"] for idea in pending])
+        parent_context.session.state[STATE_KEY_IMAGE_PROMPTS] = [
+            {"idea_id": idea["id"], "version": version, "prompt": f"{idea['id']} v{version}"}
+            for idea in pending
+            for version in (1, 2)
+        ]
+        return
+        yield
+
+
+def _run(
+    cache_dir, ideas: list[dict], planner_version: str = ""
+) -> tuple[FakePlanner, dict]:
+    """Runs a PlanCacheAgent over ``ideas`` and returns the planner and final state."""
+    planner = FakePlanner(name="planner")
+    agent = PlanCacheAgent(
+        name="plan_cache",
+        sub_agents=[planner],
+        cache_dir=cache_dir,
+        planner_version=planner_version,
+    )
+    ctx = MagicMock()
+    ctx.session.state = {STATE_KEY_IDEAS: {"ideas": ideas}}
+
+    async def run() -> None:
+        async for _ in agent._run_async_impl(ctx):
+            pass
+
+    asyncio.run(run())
+    return planner, ctx.session.state
+
+
+@pytest.fixture()
+def cache_dir(tmp_path):
+    return tmp_path / "plans"
+
+
+class TestPlanCacheAgent:
+    def test_miss_plans_all_ideas_in_one_run_and_caches_them(self, cache_dir):
+        planner, state = _run(cache_dir, IDEAS)
+
+        assert planner.planned == [["idea_1", "idea_2"]]
+        assert [e["idea_id"] for e in state[STATE_KEY_IMAGE_PROMPTS]] == [
+            "idea_1", "idea_1", "idea_2", "idea_2",
+        ]
+        for idea in IDEAS:
+            assert (cache_dir / f"{plan_key(idea)}.json").is_file()
+
+    def test_hit_skips_the_planner_and_relabels_prompts(self, cache_dir):
+        _run(cache_dir, IDEAS)
+        renamed = [{**idea, "id": f"new_{idea['id']}"} for idea in IDEAS]
+
+        planner, state = _run(cache_dir, renamed)
+
+        assert planner.planned == []
+        assert [(e["idea_id"], e["prompt"]) for e in state[STATE_KEY_IMAGE_PROMPTS]] == [
+            ("new_idea_1", "idea_1 v1"),
+            ("new_idea_1", "idea_1 v2"),
+            ("new_idea_2", "idea_2 v1"),
+            ("new_idea_2", "idea_2 v2"),
+        ]
+
+    def test_plans_only_uncached_ideas(self, cache_dir):
+        _run(cache_dir, IDEAS[:1])
+
+        planner, state = _run(cache_dir, IDEAS)
+
+        assert planner.planned == [["idea_2"]]
+        assert len(state[STATE_KEY_IMAGE_PROMPTS]) == 4
+
+    def test_other_planner_version_is_a_miss(self, cache_dir):
+        _run(cache_dir, IDEAS, planner_version="model-a")
+
+        planner, _ = _run(cache_dir, IDEAS, planner_version="model-b")
+
+        assert planner.planned == [["idea_1", "idea_2"]]
+
+    def test_unreadable_plan_is_a_miss(self, cache_dir):
+        cache_dir.mkdir()
+        (cache_dir / f"{plan_key(IDEAS[0])}.json").write_text('[{"idea_id": ')
+
+        planner, state = _run(cache_dir, IDEAS[:1])
+
+        assert planner.planned == [["idea_1"]]
+        assert json.loads((cache_dir / f"{plan_key(IDEAS[0])}.json").read_text())
+
+    def test_plan_with_invalid_prompts_is_a_miss(self, cache_dir):
+        cache_dir.mkdir()
+        (cache_dir / f"{plan_key(IDEAS[0])}.json").write_text('[{"idea_id": "idea_1"}]')
+
+        planner, state = _run(cache_dir, IDEAS[:1])
+
+        assert planner.planned == [["idea_1"]]
+        assert [e["prompt"] for e in state[STATE_KEY_IMAGE_PROMPTS]] == ["idea_1 v1", "idea_1 v2"]
+
+    def test_unwritable_cache_still_returns_prompts(self, cache_dir):
+        cache_dir.write_text("not a directory")
+
+        planner, state = _run(cache_dir, IDEAS[:1])
+
+        assert planner.planned == [["idea_1"]]
+        assert len(state[STATE_KEY_IMAGE_PROMPTS]) == 2
@@ -0,0 +1,24 @@
+"""Tests for product file parsing helpers."""
+
+import pytest
+
+from agents.ideation.product_parsing import extract_category_from_url
+
+
+class TestExtractCategoryFromUrl:
+    @pytest.mark.parametrize(
+        ("url", "category"),
+        [
+            ("https://www.on.com/en-us/products/cloud-6-m-3md3/mens/black-shoes-3MD30", "shoes"),
+            ("https://www.on.com/en-us/products/core-tee/womens/APPAREL-white", "apparel"),
+            ("https://www.on.com/en-us/accessories/performance-cap", "accessories"),
+            ("https://www.on.com/en-us/explore/stories", "other"),
+        ],
+    )
+    def test_detects_category(self, url, category):
+        assert extract_category_from_url(url) == category
+
+    def test_prefers_shoes_over_earlier_apparel(self):
+        url = "https://www.on.com/en-us/products/trail-apparel-kit/mens/black-shoes-1ME10"
+
+        assert extract_category_from_url(url) == "shoes"
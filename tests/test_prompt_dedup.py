@@ -0,0 +1,247 @@
+"""Tests for generating identical prompts once per run and copying the image to later ideas."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from google.adk.agents import BaseAgent
+
+import agents.assets_generator.agent as assets_agent
+import agents.assets_generator.tools as assets_tools
+from agents.assets_generator.agent import ForEachIdeaAgent, ForEachPromptAgent, SharedImages
+from agents.assets_generator.tools import prompt_digest
+from agents.shared.schemas import STATE_KEY_IDEAS, STATE_KEY_IMAGE_PROMPTS, STATE_KEY_IMAGE_RESULTS
+
+
+def _idea(idea_id: str, photos: list[str]) -> dict:
+    return {"id": idea_id, "product_image_urls": photos}
+
+
+def _prompt(idea_id: str, version: int, text: str) -> dict:
+    return {"idea_id": idea_id, "version": version, "prompt": text}
+
+
+def _fork_context(ctx, branch: str, **state):
+    """Stands in for the InvocationContext copy: a fresh state dict per fork."""
+    fork = MagicMock()
+    fork.branch = branch
+    fork.session.state = {**ctx.session.state, **state}
+    return fork
+
+
+@pytest.fixture(autouse=True)
+def fake_fork(monkeypatch):
+    monkeypatch.setattr(assets_agent, "_fork_context", _fork_context)
+
+
+@pytest.fixture()
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets_tools, "OUTPUT_DIR", tmp_path / "output")
+    return tmp_path / "output"
+
+
+class StateRecorder(BaseAgent):
+    """Records the state each idea's pipeline was started with."""
+
+    seen: list[dict] = []
+
+    async def run_async(self, parent_context):
+        self.seen.append(dict(parent_context.session.state))
+        return
+        yield
+
+
+class ScriptedImageGenerator(BaseAgent):
+    """Writes a placeholder image for ``current_prompt`` and records the prompt."""
+
+    calls: list[tuple] = []
+
+    async def run_async(self, parent_context):
+        state = parent_context.session.state
+        entry = state["current_prompt"]
+        self.calls.append((entry["idea_id"], entry["version"]))
+        output_path = assets_tools._output_path(entry["idea_id"], entry["version"])
+        output_path.write_bytes(entry["prompt"].encode("utf-8"))
+        state[STATE_KEY_IMAGE_RESULTS] = [
+            {"idea_id": entry["idea_id"], "version": entry["version"], "path": str(output_path)}
+        ]
+        return
+        yield
+
+
+def _run_ideas(ideas: list[dict], prompts: list[dict]) -> StateRecorder:
+    """Runs a ForEachIdeaAgent and returns the recorder holding each idea's state."""
+    recorder = StateRecorder(name="idea_pipeline")
+    agent = ForEachIdeaAgent(name="for_each_idea", sub_agents=[recorder])
+    ctx = MagicMock()
+    ctx.session.state = {STATE_KEY_IDEAS: {"ideas": ideas}, STATE_KEY_IMAGE_PROMPTS: prompts}
+
+    async def run() -> None:
+        async for _ in agent._run_async_impl(ctx):
+            pass
+
+    asyncio.run(run())
+    return recorder
+
+
+async def _run_prompts(agent: ForEachPromptAgent, idea: dict, state: dict) -> dict:
+    """Runs ``agent`` for one idea and returns the idea's final state."""
+    ctx = MagicMock()
+    ctx.session.state = {"current_idea": idea, **state}
+    async for _ in agent._run_async_impl(ctx):
+        pass
+    return ctx.session.state
+
+
+# ---------------------------------------------------------------------------
+# SharedImages tests
+# ---------------------------------------------------------------------------
+
+
+class TestSharedImages:
+    def test_first_claim_owns_the_digest(self):
+        async def claims() -> list[bool]:
+            shared = SharedImages()
+            return [shared.claim("a"), shared.claim("a"), shared.claim("b")]
+
+        assert asyncio.run(claims()) == [True, False, True]
+
+    def test_result_waits_for_publish(self):
+        async def scenario():
+            shared = SharedImages()
+            shared.claim("a")
+            waiter = asyncio.create_task(shared.result("a"))
+            await asyncio.sleep(0)
+            assert not waiter.done()
+            shared.publish("a", {"path": "x.png"})
+            return await waiter
+
+        assert asyncio.run(scenario()) == {"path": "x.png"}
+
+    def test_first_publish_wins(self):
+        async def scenario():
+            shared = SharedImages()
+            shared.claim("a")
+            shared.publish("a", None)
+            shared.publish("a", {"path": "x.png"})
+            return await shared.result("a")
+
+        assert asyncio.run(scenario()) is None
+
+
+# ---------------------------------------------------------------------------
+# ForEachIdeaAgent dedupe tests
+# ---------------------------------------------------------------------------
+
+
+class TestForEachIdeaDedupe:
+    def test_later_idea_gets_identical_prompt_as_duplicate(self):
+        ideas = [_idea("idea_1", ["a.jpg"]), _idea("idea_2", ["a.jpg"])]
+        prompts = [
+            _prompt("idea_1", 1, "Shoe on a track"),
+            _prompt("idea_2", 1, "Shoe on a track"),
+            _prompt("idea_2", 2, "Shoe on a roof"),
+        ]
+
+        seen = {state["current_idea"]["id"]: state for state in _run_ideas(ideas, prompts).seen}
+
+        assert [e["prompt"] for e in seen["idea_1"][STATE_KEY_IMAGE_PROMPTS]] == ["Shoe on a track"]
+        assert [e["prompt"] for e in seen["idea_2"][STATE_KEY_IMAGE_PROMPTS]] == ["Shoe on a roof"]
+        assert [e["version"] for e in seen["idea_2"]["duplicate_prompts"]] == [1]
+        assert seen["idea_1"]["shared_images"] is seen["idea_2"]["shared_images"]
+
+    def test_same_text_with_other_photos_is_not_a_duplicate(self):
+        ideas = [_idea("idea_1", ["a.jpg"]), _idea("idea_2", ["b.jpg"])]
+        prompts = [_prompt("idea_1", 1, "Shoe on a track"), _prompt("idea_2", 1, "Shoe on a track")]
+
+        seen = _run_ideas(ideas, prompts).seen
+
+        assert all(len(state[STATE_KEY_IMAGE_PROMPTS]) == 1 for state in seen)
+        assert all(state["duplicate_prompts"] == [] for state in seen)
+
+    def test_entries_carry_the_claimed_digest(self):
+        ideas = [_idea("idea_1", ["a.jpg"]), _idea("idea_2", ["a.jpg"])]
+        prompts = [_prompt("idea_1", 1, "Shoe on a track"), _prompt("idea_2", 1, "Shoe on a track")]
+        digest = prompt_digest(prompts[0], ["a.jpg"])
+
+        seen = {state["current_idea"]["id"]: state for state in _run_ideas(ideas, prompts).seen}
+
+        assert seen["idea_1"][STATE_KEY_IMAGE_PROMPTS][0]["digest"] == digest
+        assert seen["idea_2"]["duplicate_prompts"][0]["digest"] == digest
+
+
+# ---------------------------------------------------------------------------
+# ForEachPromptAgent dedupe tests
+# ---------------------------------------------------------------------------
+
+
+class TestForEachPromptDedupe:
+    def test_duplicate_copies_the_owners_image(self, output_dir):
+        idea_1, idea_2 = _idea("idea_1", []), _idea("idea_2", [])
+        owned = {**_prompt("idea_1", 1, "Shoe on a track"), "digest": "d1"}
+        duplicate = {**_prompt("idea_2", 3, "Shoe on a track"), "digest": "d1"}
+        generator = ScriptedImageGenerator(name="image_generator")
+        agent = ForEachPromptAgent(name="for_each_prompt", sub_agents=[generator])
+
+        async def scenario() -> dict:
+            shared = SharedImages()
+            shared.claim("d1")
+            # The duplicate's idea starts first and waits for the owner's image
+            duplicate_run = asyncio.create_task(_run_prompts(agent, idea_2, {
+                STATE_KEY_IMAGE_PROMPTS: [],
+                "duplicate_prompts": [duplicate],
+                "shared_images": shared,
+            }))
+            await _run_prompts(agent, idea_1, {
+                STATE_KEY_IMAGE_PROMPTS: [owned],
+                "shared_images": shared,
+            })
+            return await duplicate_run
+
+        state = asyncio.run(scenario())
+
+        assert generator.calls == [("idea_1", 1)]
+        copy_path = output_dir / "idea_2_v3.png"
+        assert state[STATE_KEY_IMAGE_RESULTS] == [
+            {"idea_id": "idea_2", "version": 3, "path": str(copy_path)}
+        ]
+        assert copy_path.read_bytes() == b"Shoe on a track"
+
+    def test_duplicate_of_a_failed_prompt_gets_no_image(self, output_dir):
+        duplicate = {**_prompt("idea_2", 1, "Shoe on a track"), "digest": "d1"}
+        generator = ScriptedImageGenerator(name="image_generator")
+        agent = ForEachPromptAgent(name="for_each_prompt", sub_agents=[generator])
+
+        async def scenario() -> dict:
+            shared = SharedImages()
+            shared.claim("d1")
+            shared.publish("d1", None)
+            return await _run_prompts(agent, _idea("idea_2", []), {
+                STATE_KEY_IMAGE_PROMPTS: [],
+                "duplicate_prompts": [duplicate],
+                "shared_images": shared,
+            })
+
+        state = asyncio.run(scenario())
+
+        assert generator.calls == []
+        assert state[STATE_KEY_IMAGE_RESULTS] == []
+
+    def test_batch_results_are_published_for_later_ideas(self, output_dir):
+        owned = {**_prompt("idea_1", 1, "Shoe on a track"), "digest": "d1"}
+        batch_result = {"idea_id": "idea_1", "version": 1, "path": "output/idea_1_v1.png"}
+        generator = ScriptedImageGenerator(name="image_generator")
+        agent = ForEachPromptAgent(name="for_each_prompt", sub_agents=[generator])
+
+        async def scenario() -> dict | None:
+            shared = SharedImages()
+            shared.claim("d1")
+            await _run_prompts(agent, _idea("idea_1", []), {
+                STATE_KEY_IMAGE_PROMPTS: [owned],
+                STATE_KEY_IMAGE_RESULTS: [batch_result],
+                "shared_images": shared,
+            })
+            return await shared.result("d1")
+
+        assert asyncio.run(scenario()) == batch_result
+        assert generator.calls == []
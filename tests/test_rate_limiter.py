@@ -0,0 +1,46 @@
+"""Tests for the async token bucket shared by concurrent model calls."""
+
+import asyncio
+import time
+
+from agents.shared.rate_limiter import AsyncTokenBucket
+
+
+def _acquire_times(bucket: AsyncTokenBucket, calls: int) -> list[float]:
+    """Acquires ``calls`` tokens concurrently and returns when each got through."""
+
+    async def run() -> list[float]:
+        start = time.monotonic()
+
+        async def one() -> float:
+            async with bucket:
+                return time.monotonic() - start
+
+        return await asyncio.gather(*(one() for _ in range(calls)))
+
+    return asyncio.run(run())
+
+
+class TestAsyncTokenBucket:
+    def test_burst_goes_through_immediately(self):
+        times = _acquire_times(AsyncTokenBucket(rate_per_min=60, burst=3), 3)
+
+        assert max(times) < 0.05
+
+    def test_waits_for_refill_after_burst(self):
+        # 600/min = one token every 0.1s
+        times = sorted(_acquire_times(AsyncTokenBucket(rate_per_min=600, burst=1), 3))
+
+        assert times[0] < 0.05
+        assert times[2] >= 0.18
+
+    def test_zero_rate_disables_limiting(self):
+        times = _acquire_times(AsyncTokenBucket(rate_per_min=0), 10)
+
+        assert max(times) < 0.05
+
+    def test_reusable_across_event_loops(self):
+        bucket = AsyncTokenBucket(rate_per_min=6000, burst=1)
+
+        _acquire_times(bucket, 2)
+        _acquire_times(bucket, 2)
@@ -0,0 +1,81 @@
+"""Tests for RetryAgent's retry and fast-fail decisions."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from google.adk.agents import BaseAgent
+
+from agents.assets_generator.retry_agent import RetryAgent
+from agents.shared.schemas import (
+    STATE_KEY_IMAGE_RESULTS,
+    STATE_KEY_LAST_ERROR_CODE,
+    STATE_KEY_LAST_FINISH_REASON,
+)
+
+IMAGE_RESULT = {"idea_id": "idea_1", "version": 1, "path": "output/idea_1_v1.png"}
+
+
+class ScriptedAgent(BaseAgent):
+    """Applies one scripted state update per run instead of calling a model."""
+
+    outcomes: list[dict] = []
+    calls: int = 0
+
+    async def run_async(self, parent_context):
+        parent_context.session.state.update(self.outcomes[self.calls])
+        self.calls += 1
+        return
+        yield
+
+
+def _run(outcomes: list[dict]) -> tuple[ScriptedAgent, dict]:
+    """Runs a RetryAgent (no backoff delay) over the scripted outcomes."""
+    sub_agent = ScriptedAgent(name="image_generator", outcomes=outcomes)
+    agent = RetryAgent(name="retry", sub_agents=[sub_agent], max_retries=3, base_delay=0.0)
+    ctx = MagicMock()
+    ctx.session.state = {}
+
+    async def run() -> None:
+        async for _ in agent._run_async_impl(ctx):
+            pass
+
+    asyncio.run(run())
+    return sub_agent, ctx.session.state
+
+
+class TestRetryAgent:
+    def test_stops_after_first_success(self):
+        sub_agent, state = _run([{STATE_KEY_IMAGE_RESULTS: [IMAGE_RESULT]}])
+
+        assert sub_agent.calls == 1
+        assert state[STATE_KEY_IMAGE_RESULTS] == [IMAGE_RESULT]
+
+    def test_retries_until_success(self):
+        sub_agent, state = _run([{}, {STATE_KEY_IMAGE_RESULTS: [IMAGE_RESULT]}])
+
+        assert sub_agent.calls == 2
+        assert state[STATE_KEY_IMAGE_RESULTS] == [IMAGE_RESULT]
+
+    def test_gives_up_after_max_retries(self):
+        sub_agent, state = _run([{}, {}, {}])
+
+        assert sub_agent.calls == 3
+        assert not state.get(STATE_KEY_IMAGE_RESULTS)
+
+    def test_fails_fast_on_safety_block(self):
+        sub_agent, _ = _run([{STATE_KEY_LAST_FINISH_REASON: "IMAGE_SAFETY"}])
+
+        assert sub_agent.calls == 1
+
+    def test_fails_fast_on_invalid_request(self):
+        sub_agent, _ = _run([{STATE_KEY_LAST_ERROR_CODE: 400}])
+
+        assert sub_agent.calls == 1
+
+    def test_retries_rate_limit_errors(self):
+        sub_agent, _ = _run([
+            {STATE_KEY_LAST_ERROR_CODE: 429},
+            {STATE_KEY_IMAGE_RESULTS: [IMAGE_RESULT]},
+        ])
+
+        assert sub_agent.calls == 2
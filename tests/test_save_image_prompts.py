@@ -0,0 +1,86 @@
+"""Tests for validating and storing image prompts via save_image_prompts."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from agents.shared.schemas import STATE_KEY_IMAGE_PROMPTS
+
+SAMPLE_PROMPTS = [
+    {"idea_id": "idea_1", "version": 1, "prompt": "Cloud 6 on a white seamless background"},
+    {"idea_id": "idea_1", "version": 2, "prompt": "Cloud 6 mid-stride on a city track"},
+]
+
+
+@pytest.fixture()
+def mock_tool_context():
+    """Create a mock ToolContext with a plain dict as state."""
+    ctx = MagicMock()
+    ctx.state = {}
+    return ctx
+
+
+class TestSaveImagePrompts:
+    def test_stores_prompts_in_state(self, mock_tool_context):
+        from agents.assets_generator.tools import save_image_prompts
+
+        result = save_image_prompts(json.dumps(SAMPLE_PROMPTS), mock_tool_context)
+
+        assert mock_tool_context.state[STATE_KEY_IMAGE_PROMPTS] == SAMPLE_PROMPTS
+        assert "Saved 2 image prompts" in result
+
+    def test_coerces_numeric_version(self, mock_tool_context):
+        from agents.assets_generator.tools import save_image_prompts
+
+        prompts = [{**SAMPLE_PROMPTS[0], "version": "1"}]
+        save_image_prompts(json.dumps(prompts), mock_tool_context)
+
+        assert mock_tool_context.state[STATE_KEY_IMAGE_PROMPTS][0]["version"] == 1
+
+    @pytest.mark.parametrize(
+        "prompts_json",
+        [
+            "not json",
+            json.dumps({"idea_id": "idea_1"}),
+            json.dumps([{"idea_id": "idea_1", "version": 1}]),
+            json.dumps([]),
+        ],
+    )
+    def test_rejects_invalid_prompts(self, mock_tool_context, prompts_json):
+        from agents.assets_generator.tools import save_image_prompts
+
+        result = save_image_prompts(prompts_json, mock_tool_context)
+
+        assert result.startswith("Error:")
+        assert STATE_KEY_IMAGE_PROMPTS not in mock_tool_context.state
+
+    def test_merges_prompts_across_calls(self, mock_tool_context):
+        from agents.assets_generator.tools import save_image_prompts
+
+        idea_2 = {"idea_id": "idea_2", "version": 1, "prompt": "Cloudmonster on a trail"}
+        resent = {**SAMPLE_PROMPTS[1], "prompt": "Cloud 6 on a rooftop at dusk"}
+        save_image_prompts(json.dumps(SAMPLE_PROMPTS), mock_tool_context)
+        save_image_prompts(json.dumps([idea_2, resent]), mock_tool_context)
+
+        assert mock_tool_context.state[STATE_KEY_IMAGE_PROMPTS] == [
+            SAMPLE_PROMPTS[0],
+            resent,
+            idea_2,
+        ]
+
+    def test_keeps_turn_open_until_all_pending_ideas_are_planned(self, mock_tool_context):
+        from agents.assets_generator.tools import save_image_prompts
+
+        mock_tool_context.state["pending_ideas"] = [{"id": "idea_1"}, {"id": "idea_2"}]
+        mock_tool_context.actions.skip_summarization = False
+
+        result = save_image_prompts(json.dumps(SAMPLE_PROMPTS), mock_tool_context)
+
+        assert "Still missing prompts for: idea_2" in result
+        assert mock_tool_context.actions.skip_summarization is False
+
+        idea_2 = [{"idea_id": "idea_2", "version": 1, "prompt": "Cloudmonster on a trail"}]
+        save_image_prompts(json.dumps(idea_2), mock_tool_context)
+
+        assert mock_tool_context.actions.skip_summarization is True
@@ -0,0 +1,202 @@
+"""Tests for keyword search over the product catalog and its collections fallback."""
+
+import json
+import random
+
+import pytest
+
+import agents.ideation.tools as ideation_tools
+from agents.ideation.tools import _find_all, _join_with_offsets, search_products
+
+WORDS = ["cloud", "cloudmonster", "run", "running", "black", "white", "café", "trail-x", "6"]
+
+
+def _product(sku: str, name: str, **fields) -> dict:
+    return {
+        "name": name,
+        "sku": sku,
+        "product_group": fields.get("product_group", ""),
+        "description": fields.get("description", ""),
+        "color": fields.get("color", ""),
+        "category": fields.get("category", "shoes"),
+    }
+
+
+def _linear_search(products: list[dict], query: str) -> list[str]:
+    """Reference implementation: substring match of every keyword, first 20 hits."""
+    keywords = query.lower().split()
+    if not keywords:
+        return []
+    skus = []
+    for product in products:
+        searchable = " ".join(
+            product.get(field, "")
+            for field in ("name", "product_group", "description", "color", "category")
+        ).lower()
+        if all(kw in searchable for kw in keywords):
+            skus.append(product["sku"])
+            if len(skus) >= 20:
+                break
+    return skus
+
+
+def _search_skus(query: str) -> list[str]:
+    return [product["sku"] for product in json.loads(search_products(query))["products"]]
+
+
+@pytest.fixture()
+def catalog(monkeypatch, tmp_path):
+    """Install an in-memory catalog (and an empty collections dir) for search."""
+
+    def install(products: list[dict]) -> None:
+        monkeypatch.setattr(ideation_tools, "_products_cache", products)
+        monkeypatch.setattr(
+            ideation_tools, "_search_index_cache", ideation_tools._build_search_index(products)
+        )
+        ideation_tools._search_products.cache_clear()
+
+    monkeypatch.setattr(ideation_tools, "COLLECTIONS_DIR", tmp_path)
+    monkeypatch.setattr(ideation_tools, "_collections_cache", None)
+    yield install
+    ideation_tools._search_products.cache_clear()
+
+
+# ---------------------------------------------------------------------------
+# _find_all tests
+# ---------------------------------------------------------------------------
+
+
+class TestFindAll:
+    def test_matches_first_and_last_text(self):
+        blob, starts = _join_with_offsets(["abc", "xyz", "abc"])
+
+        assert _find_all("abc", blob, starts) == {0, 2}
+
+    def test_matches_next_to_newline(self):
+        # "ab" ends text 0 and starts text 1, on both sides of the separator
+        blob, starts = _join_with_offsets(["xab", "abx", "zzz"])
+
+        assert _find_all("ab", blob, starts) == {0, 1}
+
+    def test_never_matches_across_texts(self):
+        blob, starts = _join_with_offsets(["abc", "def"])
+
+        assert _find_all("cd", blob, starts) == set()
+
+    def test_reports_repeated_match_once(self):
+        blob, starts = _join_with_offsets(["aaaa", "b", "aa"])
+
+        assert _find_all("a", blob, starts) == {0, 2}
+
+    def test_empty_texts(self):
+        blob, starts = _join_with_offsets(["", "a", ""])
+
+        assert _find_all("a", blob, starts) == {1}
+
+
+# ---------------------------------------------------------------------------
+# search_products tests
+# ---------------------------------------------------------------------------
+
+
+class TestSearchProducts:
+    def test_matches_every_keyword_case_insensitively(self, catalog):
+        catalog([
+            _product("1", "Cloud 6", color="Black"),
+            _product("2", "Cloud 6", color="White"),
+            _product("3", "Cloudmonster", color="Black"),
+        ])
+
+        assert _search_skus("CLOUD black") == ["1", "3"]
+
+    def test_matches_substrings_of_tokens(self, catalog):
+        catalog([_product("1", "Cloudmonster"), _product("2", "Running tee")])
+
+        assert _search_skus("onst") == ["1"]
+        assert _search_skus("run") == ["2"]
+
+    def test_matches_non_alphanumeric_keywords(self, catalog):
+        catalog([
+            _product("1", "Cloud-6 café", color="Ivory | Frost"),
+            _product("2", "Cloud 6 cafe"),
+        ])
+
+        assert _search_skus("d-6") == ["1"]
+        assert _search_skus("café") == ["1"]
+        assert _search_skus("ivory |") == ["1"]
+
+    def test_duplicate_keywords_match_like_one(self, catalog):
+        catalog([_product("1", "Cloud 6"), _product("2", "Cloudmonster")])
+
+        assert _search_skus("cloud cloud 6") == _search_skus("cloud 6") == ["1"]
+
+    def test_caps_results_at_20_in_catalog_order(self, catalog):
+        catalog([_product(str(i), f"Cloud {i}") for i in range(25)])
+
+        result = json.loads(search_products("cloud"))
+
+        assert result["match_count"] == 20
+        assert [p["sku"] for p in result["products"]] == [str(i) for i in range(20)]
+
+    def test_empty_query_matches_nothing(self, catalog):
+        catalog([_product("1", "Cloud 6")])
+
+        assert json.loads(search_products("   ")) == {
+            "query": "   ",
+            "match_count": 0,
+            "products": [],
+        }
+
+    def test_agrees_with_linear_scan(self, catalog):
+        rng = random.Random(1)
+        products = [
+            _product(
+                str(i),
+                " ".join(rng.choices(WORDS, k=3)),
+                product_group=rng.choice(WORDS),
+                description=f"Desc {rng.choice(WORDS)}\nline two é-x" if i % 7 == 0 else "",
+                color=rng.choice(["Black", "Ivory | Frost"]),
+                category=rng.choice(["shoes", "apparel"]),
+            )
+            for i in range(300)
+        ]
+        catalog(products)
+
+        for _ in range(500):
+            query = "".join(rng.choices("abcdeloun6 -é|", k=rng.randint(0, 8)))
+            assert _search_skus(query) == _linear_search(products, query), repr(query)
+
+
+class TestCollectionsFallback:
+    def _write_collection(self, directory, name: str, title: str, description: str) -> None:
+        (directory / f"{name}.json").write_text(json.dumps({
+            "url": f"https://on.com/collections/{name}",
+            "content": {"title": title},
+            "metadata": {"openGraph": {"og:description": description}},
+        }))
+
+    def test_adds_matching_collections_when_no_product_matches(self, catalog, tmp_path):
+        catalog([_product("1", "Cloud 6")])
+        self._write_collection(tmp_path, "trail", "Trail Running", "Shoes for the mountains")
+        self._write_collection(tmp_path, "city", "City", "Everyday TRAIL and road")
+        self._write_collection(tmp_path, "tennis", "Tennis", "Court shoes")
+
+        result = json.loads(search_products("trail"))
+
+        assert result["match_count"] == 0
+        assert [c["name"] for c in result["related_collections"]] == ["City", "Trail Running"]
+
+    def test_caps_collections_at_5(self, catalog, tmp_path):
+        catalog([])
+        for i in range(7):
+            self._write_collection(tmp_path, f"c{i}", f"Trail {i}", "")
+
+        result = json.loads(search_products("trail"))
+
+        assert len(result["related_collections"]) == 5
+
+    def test_omits_collections_when_products_match(self, catalog, tmp_path):
+        catalog([_product("1", "Trail shoe")])
+        self._write_collection(tmp_path, "trail", "Trail Running", "")
+
+        assert "related_collections" not in json.loads(search_products("trail"))
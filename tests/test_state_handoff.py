@@ -5,6 +5,7 @@ from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
+from pydantic import ValidationError
 
 from agents.shared.schemas import STATE_KEY_IDEAS, IdeasOutput
 
@@ -20,7 +21,7 @@ SAMPLE_IDEAS = {
             "id": "idea_1",
             "product_name": "Cloud 6",
             "product_sku": "SKU001",
-            "product_image_url": "https://example.com/cloud6.jpg",
+            "product_image_urls": ["https://example.com/cloud6.jpg"],
             "imagery_direction": "Minimalist hero shot on white background",
             "headline": "Run on Clouds",
             "post_description": "Experience the next generation of running.",
@@ -46,12 +47,17 @@ def output_dir(tmp_path, monkeypatch):
 
     monkeypatch.setattr(ideation_tools, "OUTPUT_DIR", tmp_path)
     monkeypatch.setattr(assets_tools, "OUTPUT_DIR", tmp_path)
-    # Also patch PROJECT_ROOT for fallback path in load_ideas
-    monkeypatch.setattr(assets_tools, "PROJECT_ROOT", tmp_path)
     (tmp_path / "output").mkdir(exist_ok=True)
     return tmp_path
 
 
+def _wait_for_ideas_file():
+    """Block until the background ideas.json write has landed."""
+    from agents.ideation.tools import _ideas_writer
+
+    _ideas_writer.submit(lambda: None).result()
+
+
 # ---------------------------------------------------------------------------
 # save_ideas tests
 # ---------------------------------------------------------------------------
@@ -73,6 +79,7 @@ class TestSaveIdeas:
         from agents.ideation.tools import save_ideas
 
         save_ideas(json.dumps(SAMPLE_IDEAS), mock_tool_context)
+        _wait_for_ideas_file()
 
         ideas_file = output_dir / "ideas.json"
         assert ideas_file.exists()
@@ -83,14 +90,26 @@ class TestSaveIdeas:
         from agents.ideation.tools import save_ideas
 
         save_ideas(json.dumps(SAMPLE_IDEAS), mock_tool_context)
+        _wait_for_ideas_file()
 
         file_data = json.loads((output_dir / "ideas.json").read_text())
         assert mock_tool_context.state[STATE_KEY_IDEAS] == file_data
 
+    def test_logs_failed_file_write(self, mock_tool_context, output_dir, caplog):
+        from agents.ideation.tools import save_ideas
+
+        # A directory in the file's place makes the background write fail
+        (output_dir / "ideas.json").mkdir()
+        result = save_ideas(json.dumps(SAMPLE_IDEAS), mock_tool_context)
+        _wait_for_ideas_file()
+
+        assert "Saved 1 ideas" in result
+        assert "Failed to write ideas.json" in caplog.text
+
     def test_rejects_invalid_json(self, mock_tool_context, output_dir):
         from agents.ideation.tools import save_ideas
 
-        with pytest.raises(json.JSONDecodeError):
+        with pytest.raises(ValidationError):
             save_ideas("not json", mock_tool_context)
 
     def test_rejects_invalid_schema(self, mock_tool_context, output_dir):